@@ -0,0 +1,268 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+_ARTIFACT_ID_PATTERN = re.compile(r"[a-z]+_[0-9a-f]{32}")
+
+
+class Artifact:
+    """
+    A stored resume or job posting.
+
+    `text` and `meta` are the uploaded content and are persisted to disk.
+    `derived` holds values computed from them (embeddings, features, ...),
+    which are kept in memory only since they can always be recomputed.
+    """
+
+    def __init__(self, artifact_id: str, kind: str, text: str, meta: Dict[str, Any]):
+        self.id = artifact_id
+        self.kind = kind
+        self.text = text
+        self.meta = meta
+        self.derived: Dict[str, Any] = {}
+        self.nbytes = _sizeof(text) + _sizeof(meta)
+        self.last_used = time.time()
+        self.disk_touched = self.last_used  # When the disk copy's mtime was last refreshed
+
+
+def _sizeof(value: Any) -> int:
+    """
+    Approximates the memory used by an artifact value.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict):
+        return sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(_sizeof(v) for v in value)
+    return 64
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for resumes and job postings.
+
+    Artifacts are kept in memory (LRU) under `max_memory_bytes`, and optionally
+    written to `directory` under `max_disk_bytes` so they survive eviction and are
+    shared between workers. Artifacts expire `ttl_seconds` after their last use.
+
+    Disk usage is tracked as a running total of this process's writes. The directory
+    is only scanned (in a background thread) when that total exceeds the budget, or
+    every `disk_scan_interval` seconds to expire old files and count other workers' writes.
+    Memory hits refresh the disk copy's mtime at most every `disk_touch_interval` seconds,
+    so artifacts in constant use are not expired on disk while they live in memory.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_memory_bytes: int = 256 * 1024 ** 2,
+                 max_disk_bytes: int = 1024 ** 3, ttl_seconds: int = 24 * 3600, disk_scan_interval: int = 600,
+                 disk_touch_interval: int = 3600):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_scan_interval = disk_scan_interval
+        self.disk_touch_interval = disk_touch_interval
+        self._artifacts: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self._last_disk_scan = 0.0  # Never scanned, so the first write schedules a scan
+        self._disk_scan_running = False
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_id(kind: str, text: str, meta: Dict[str, Any]) -> str:
+        """
+        Builds the content-addressed id of an artifact.
+        """
+        content = json.dumps({'text': text, 'meta': meta}, sort_keys=True)
+        return f"{kind}_{hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]}"
+
+    def put(self, kind: str, text: str, meta: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Stores an artifact and returns its id. Storing the same content twice is a no-op.
+        """
+        meta = meta or {}
+        artifact_id = self.make_id(kind, text, meta)
+
+        if self.get(artifact_id) is not None:
+            return artifact_id
+
+        artifact = Artifact(artifact_id, kind, text, meta)
+        with self._lock:
+            self._insert(artifact)
+
+        if self.directory:
+            self._write_to_disk(artifact)
+
+        return artifact_id
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        """
+        Returns an artifact, loading it from disk if it was evicted from memory.
+        Returns None if it is unknown or expired.
+        """
+        now = time.time()
+        touch = False
+        with self._lock:
+            artifact = self._artifacts.get(artifact_id)
+            if artifact is not None:
+                if now - artifact.last_used > self.ttl_seconds:
+                    self._remove(artifact_id)
+                    artifact = None
+                else:
+                    artifact.last_used = now
+                    self._artifacts.move_to_end(artifact_id)
+                    if self.directory and now - artifact.disk_touched > self.disk_touch_interval:
+                        artifact.disk_touched = now
+                        touch = True
+
+        if artifact is not None:
+            if touch:
+                self._touch_on_disk(artifact)
+            return artifact
+
+        artifact = self._read_from_disk(artifact_id)
+        if artifact is not None:
+            with self._lock:
+                self._insert(self._artifacts.get(artifact_id) or artifact)
+                return self._artifacts.get(artifact_id)
+        return None
+
+    def derive(self, artifact: Artifact, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Returns a value derived from an artifact, computing and caching it on first use.
+        """
+        if name in artifact.derived:
+            return artifact.derived[name]
+
+        value = factory()
+        with self._lock:
+            if name not in artifact.derived:
+                artifact.derived[name] = value
+                size = _sizeof(value)
+                artifact.nbytes += size
+                if artifact.id in self._artifacts:
+                    self._memory_bytes += size
+                    self._evict()
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the number of artifacts and bytes held in memory.
+        """
+        with self._lock:
+            return {'artifacts': len(self._artifacts), 'memoryBytes': self._memory_bytes}
+
+    def _insert(self, artifact: Artifact):
+        if artifact.id in self._artifacts:
+            artifact.last_used = time.time()  # Keep the LRU order in last_used order
+            self._artifacts.move_to_end(artifact.id)
+            return
+        self._artifacts[artifact.id] = artifact
+        self._memory_bytes += artifact.nbytes
+        self._evict()
+
+    def _remove(self, artifact_id: str):
+        artifact = self._artifacts.pop(artifact_id)
+        self._memory_bytes -= artifact.nbytes
+
+    def _evict(self):
+        # Drop expired artifacts first, then least recently used ones until under budget.
+        # The LRU order is also last_used order, so expired artifacts are all at the front
+        now = time.time()
+        while self._artifacts and now - next(iter(self._artifacts.values())).last_used > self.ttl_seconds:
+            self._remove(next(iter(self._artifacts)))
+        while self._memory_bytes > self.max_memory_bytes and len(self._artifacts) > 1:
+            self._remove(next(iter(self._artifacts)))
+
+    def _path(self, artifact_id: str) -> str:
+        return os.path.join(self.directory, f"{artifact_id}.json")
+
+    def _write_to_disk(self, artifact: Artifact):
+        path = self._path(artifact.id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'kind': artifact.kind, 'text': artifact.text, 'meta': artifact.meta}, file)
+            size = file.tell()
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_bytes += size
+            due = (self._disk_bytes > self.max_disk_bytes
+                   or time.time() - self._last_disk_scan > self.disk_scan_interval)
+            if due and not self._disk_scan_running:
+                self._disk_scan_running = True
+                threading.Thread(target=self._enforce_disk_budget, name='artifact-disk-scan', daemon=True).start()
+
+    def _touch_on_disk(self, artifact: Artifact):
+        # Rewrite the file if it is gone (e.g. removed by another worker's scan) while still in use here
+        try:
+            try:
+                os.utime(self._path(artifact.id))
+            except FileNotFoundError:
+                self._write_to_disk(artifact)
+        except OSError:
+            pass
+
+    def _read_from_disk(self, artifact_id: str) -> Optional[Artifact]:
+        if not self.directory or not _ARTIFACT_ID_PATTERN.fullmatch(artifact_id):
+            return None
+
+        path = self._path(artifact_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            os.utime(path)  # Mark as recently used for the disk budget
+        except (OSError, ValueError):
+            return None
+
+        return Artifact(artifact_id, data['kind'], data['text'], data['meta'])
+
+    def _enforce_disk_budget(self):
+        """
+        Scans the directory, removes expired files and then the least recently used ones
+        until under the disk budget, and resets the running total to what is left.
+        """
+        total = None
+        try:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            now = time.time()
+            for mtime, size, path in sorted(entries):
+                if total <= self.max_disk_bytes and now - mtime <= self.ttl_seconds:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+        finally:
+            with self._lock:
+                # Writes made during the scan may or may not have been counted; a later scan corrects it
+                if total is not None:
+                    self._disk_bytes = total
+                self._last_disk_scan = time.time()
+                self._disk_scan_running = False
@@ -0,0 +1,240 @@
+"""
+Parallel, resumable job description augmentation (see "Synthetic Augmentation of
+Job Descriptions" in src/preprocessing.ipynb).
+
+Every unique (Role, Job_Description) pair is rewritten once by Ollama. Pairs are
+processed by a bounded pool of workers and each result is appended to a JSONL
+checkpoint as soon as it completes, so an interrupted run resumes where it stopped.
+
+Ollama only serves requests concurrently up to OLLAMA_NUM_PARALLEL, so start it with
+e.g. `OLLAMA_NUM_PARALLEL=4 ollama serve` and pass the same number of --workers.
+
+Usage:
+    python augment.py --input data/cleaned_resume_screening_dataset.csv \
+        --output data/processed_resume_screening_dataset.csv --workers 4
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Tuple
+
+import pandas as pd
+import requests
+from tqdm import tqdm
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_MODEL = "llama3.2"  # 3.2 has less parameters and is faster
+
+OPTIONS = {
+    "temperature": 0.1,  # lower temperature for more deterministic output, less likely to hallucinate
+    "num_ctx": 500,  # set it lower to reduce context length and workload on VRAM
+}
+
+# Boilerplate the model prepends to its output (cleaned up in preprocessing.ipynb)
+BOILERPLATE_PATTERN = r"Here is the rewritten job description"
+
+_local = threading.local()
+
+
+def build_prompt(role: str, job_desc: str) -> str:
+    """
+    Same prompt as augment_data in preprocessing.ipynb.
+    """
+    return f"""
+        Role: {role}
+        Context: {job_desc}
+        Task: Rewrite this job description to be a standard, professional length (<4000 words).
+        In it, only include two sections, industry standard key responsibilities and technical skills associated with {role}.
+        Make sure the technical skills are relevant to the role of {role} and are commonly used in the industry.
+        Name only 6 key responsibilities and 6 technical skills.
+        Name no company names, locations or company descriptions. Don't add placeholders for them.
+        Name no company values or benefits.
+        Format the output as:
+        Key Responsibilities:
+        - Responsibility 1
+        - Responsibility 2
+        - Responsibility 3
+        - Responsibility 4
+        - Responsibility 5
+        - Responsibility 6
+        Technical Skills:
+        - Skill 1
+        - Skill 2
+        - Skill 3
+        - Skill 4
+        - Skill 5
+        - Skill 6
+        """
+
+
+def clean_augmented(text: str) -> str:
+    """
+    Same cleanup as preprocessing.ipynb: drops the boilerplate intro and newlines.
+    """
+    text = re.sub(BOILERPLATE_PATTERN, "", text)
+    return re.sub(r"\n+", "", text)
+
+
+def jd_hash(role: str, job_desc: str) -> str:
+    """
+    Identifies a (role, job description) pair in the checkpoint.
+    """
+    return hashlib.sha256(f"{role}\n{job_desc}".encode('utf-8')).hexdigest()
+
+
+def load_checkpoint(path: str) -> Dict[str, str]:
+    """
+    Loads completed augmentations from a JSONL checkpoint.
+    A truncated last line (from a crash mid-write) is ignored.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            done[record['hash']] = record['augmented']
+    return done
+
+
+def augment_jd(role: str, job_desc: str, base_url: str, model: str, retries: int = 3) -> str:
+    """
+    Augments one job description, retrying with backoff on errors.
+    Each worker thread reuses its own HTTP session (keep-alive connection).
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+
+    for attempt in range(retries):
+        try:
+            response = session.post(
+                f"{base_url}/api/generate",
+                json={
+                    "model": model,
+                    "prompt": build_prompt(role, job_desc),
+                    "stream": False,
+                    "options": OPTIONS,
+                    "keep_alive": "30m",
+                },
+                timeout=300,
+            )
+            response.raise_for_status()
+            return response.json()['response']
+        except (requests.RequestException, KeyError, ValueError):
+            if attempt == retries - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def run_pipeline(pairs: Iterable[Tuple[str, str]], checkpoint_path: str, workers: int = 4,
+                 base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL) -> Dict[str, str]:
+    """
+    Augments every unique (role, job description) pair that is not in the checkpoint yet.
+    Returns all augmentations (previous and new) keyed by jd_hash.
+    """
+    done = load_checkpoint(checkpoint_path)
+
+    todo = {}
+    for role, job_desc in pairs:
+        key = jd_hash(role, job_desc)
+        if key not in done:
+            todo[key] = (role, job_desc)
+
+    print(f"{len(done)} job descriptions already augmented, {len(todo)} to go")
+    if not todo:
+        return done
+
+    os.makedirs(os.path.dirname(checkpoint_path) or '.', exist_ok=True)
+    failed = 0
+    started = time.perf_counter()
+
+    with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers) as executor, \
+            tqdm(total=len(todo), desc="Augmenting Job Descriptions", unit='jd') as progress:
+        # Terminate a line truncated by a crash so new records start on their own line
+        if checkpoint.tell() > 0:
+            with open(checkpoint_path, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    checkpoint.write('\n')
+
+        pending = {}
+        queue = iter(todo.items())
+
+        # Keep at most 2 requests per worker in flight, so memory stays bounded
+        # and an interrupted run has little work lost
+        while True:
+            for key, (role, job_desc) in queue:
+                pending[executor.submit(augment_jd, role, job_desc, base_url, model)] = key
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+
+            completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                key = pending.pop(future)
+                try:
+                    augmented = future.result()
+                except Exception as e:
+                    failed += 1
+                    tqdm.write(f"Failed to augment {key[:12]}: {e}")
+                    continue
+
+                done[key] = augmented
+                checkpoint.write(json.dumps({'hash': key, 'augmented': augmented}) + '\n')
+                checkpoint.flush()
+                progress.update(1)
+
+    elapsed = time.perf_counter() - started
+    completed_count = len(todo) - failed
+    print(f"Augmented {completed_count} job descriptions in {elapsed:.1f}s "
+          f"({completed_count / elapsed:.2f} rows/s), {failed} failed (rerun to retry)")
+    return done
+
+
+def augment_dataframe(df: pd.DataFrame, checkpoint_path: str, workers: int = 4,
+                      base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL) -> pd.DataFrame:
+    """
+    Adds a cleaned Augmented_Job_Description column to a dataframe with Role and Job_Description
+    columns. Rows whose augmentation failed are left empty (NaN).
+    """
+    unique_df = df[["Role", "Job_Description"]].drop_duplicates()
+    done = run_pipeline(unique_df.itertuples(index=False, name=None), checkpoint_path, workers, base_url, model)
+
+    df = df.copy()
+    augmented = (done.get(jd_hash(role, job_desc)) for role, job_desc in zip(df["Role"], df["Job_Description"]))
+    df["Augmented_Job_Description"] = [clean_augmented(text) if text is not None else None for text in augmented]
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Augment job descriptions with Ollama (parallel and resumable)')
+    parser.add_argument('--input', required=True, help='CSV with Role and Job_Description columns')
+    parser.add_argument('--output', default='data/processed_resume_screening_dataset.csv', help='CSV to write with the Augmented_Job_Description column')
+    parser.add_argument('--checkpoint', default='data/augmented_jds.jsonl', help='JSONL checkpoint used to resume interrupted runs')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent requests (match OLLAMA_NUM_PARALLEL)')
+    parser.add_argument('--base-url', default=OLLAMA_BASE_URL)
+    parser.add_argument('--model', default=OLLAMA_MODEL)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    df = augment_dataframe(df, args.checkpoint, args.workers, args.base_url, args.model)
+
+    # The notebook's clean_text fails on missing values, so never write a partial dataset
+    missing = df["Augmented_Job_Description"].isna().sum()
+    if missing:
+        raise SystemExit(f"{missing} rows are missing an augmentation, {args.output} was not written. "
+                         f"Rerun to retry them (completed ones are kept in {args.checkpoint})")
+    df.to_csv(args.output, index=False)
+    print(f"Saved {len(df)} rows to {args.output}")
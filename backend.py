@@ -6,7 +6,6 @@ import json
 import requests
 from typing import Dict, List, Tuple, Optional
 import numpy as np
-import shap
 from sklearn.preprocessing import StandardScaler
 from sentence_transformers import SentenceTransformer
 import pickle as pkl
@@ -14,7 +13,15 @@ import joblib
 from PyPDF2 import PdfReader
 from bs4 import BeautifulSoup
 import traceback
-import pandas as pd
+import atexit
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from artifact_store import Artifact, ArtifactStore
+from tracker import ApplicationTracker, STATUSES
+from model_bundle import FEATURES, ModelBundle, ModelRegistry
+from compact_responses import CompactResponses
 
 try:
     with open("data/tech_keywords.pkl", 'rb') as file:
@@ -36,19 +43,64 @@ except FileNotFoundError:
 # ====================
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
+CORS(app, expose_headers=['ETag'])  # Enable CORS for React frontend
+# Every JSON endpoint supports ?fields=a,b and gzip/br compression. ETag/If-None-Match (304) is limited to
+# GET and the one deterministic POST; the LLM endpoints' responses vary (and carry timings) on every call
+CompactResponses(app, revalidated_posts=('/api/predict',))
 
 # Ollama configuration - UPDATE THIS TO YOUR PREFERRED MODEL
 OLLAMA_BASE_URL = "http://localhost:11434"
 OLLAMA_MODEL = "llama3.2"  # Change to your preferred model
+OLLAMA_KEEP_ALIVE = "30m"  # Keep the model (and its prompt cache) loaded between calls
 
 # Embedding model placeholder - UPDATE WITH YOUR CHOICE
 # Options: sentence-transformers, nomic-embed-text via Ollama, etc.
 EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"  # Will be initialized on first use
+_embedding_model = None
 
-# ML Model placeholder - Load your trained model here
+# ML Model - the live bundle is MODEL_BUNDLE if set, else the one named in
+# src/models/bundles/CURRENT (written by `python train.py --promote`).
+# Without a bundle, the legacy model/scaler pickles below are used.
+# Changes to CURRENT/SHADOW are picked up every MODEL_POLL_SECONDS without a restart.
+MODEL_BUNDLE = os.environ.get('MODEL_BUNDLE')
 ML_MODEL = "src/models/RandomForestClassifier.pkl"
 SCALER = "src/models/StandardScaler.pkl"
+MODEL_POLL_SECONDS = float(os.environ.get('MODEL_POLL_SECONDS', 5))
+SHADOW_LOG = os.environ.get('SHADOW_LOG', 'data/shadow_disagreements.jsonl')
+# Optional: explain tree models from a precomputed SHAP grid with this many nodes per feature (0 = exact SHAP)
+SHAP_GRID_POINTS = int(os.environ.get('SHAP_GRID_POINTS', 0))
+
+# Per-endpoint Ollama options. num_predict caps the generated tokens for each task.
+# num_ctx is kept the same everywhere on purpose: Ollama reloads the model whenever
+# it changes, which costs far more than the extra context.
+OLLAMA_OPTIONS = {
+    'scrape': {'num_ctx': 4096, 'num_predict': 512},
+    'tailor': {'num_ctx': 4096, 'num_predict': 1024},
+    'cover_letter': {'num_ctx': 4096, 'num_predict': 640},
+}
+
+# Tokens reserved for the fixed wording of each prompt template
+PROMPT_TEMPLATE_TOKENS = 300
+
+# Shared system prompt for the calls of one application (tailoring + cover letter).
+# It must be identical across those calls so their prompts share a cacheable prefix.
+APPLICATION_SYSTEM_PROMPT = "You are an expert career assistant who writes ATS-optimized resumes and cover letters. Follow the task instructions exactly and output only the requested document, no meta-commentary."
+MAX_LLM_SESSIONS = 128
+LLM_SESSION_ENDPOINTS = ('tailor', 'cover_letter')  # Endpoints sharing a session's JD prefix
+
+# Server-side store for parsed resumes and scraped jobs, so later calls can send
+# `resumeId`/`jobId` instead of the full texts and reuse embeddings and features
+ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR', 'data/artifacts')
+ARTIFACT_MEMORY_BYTES = 256 * 1024 ** 2
+ARTIFACT_DISK_BYTES = 1024 ** 3
+ARTIFACT_TTL_SECONDS = 24 * 3600
+
+artifacts = ArtifactStore(ARTIFACT_DIR, ARTIFACT_MEMORY_BYTES, ARTIFACT_DISK_BYTES, ARTIFACT_TTL_SECONDS)
+
+# SQLite application tracker (writes are batched off the request path)
+TRACKER_DB = os.environ.get('TRACKER_DB', 'data/tracker.db')
+tracker = ApplicationTracker(TRACKER_DB)
+atexit.register(tracker.close)  # The writer is a daemon thread, so commit queued writes before exiting
 
 
 # ====================
@@ -84,8 +136,24 @@ def get_embedding(text: str) -> List[float]:
     # hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
     # np.random.seed(hash_val % (2**32))
     # return np.random.randn(384).tolist()  # 384 dims like MiniLM
-    model = SentenceTransformer(EMBEDDING_MODEL)
-    return model.encode(text).tolist()
+    return get_embedding_model().encode(text).tolist()
+
+
+def get_embedding_model() -> SentenceTransformer:
+    """
+    Loads the sentence transformer once per process and reuses it.
+    """
+    global _embedding_model
+    if _embedding_model is None:
+        _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+    return _embedding_model
+
+
+def get_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Generates embeddings for a list of texts in a single batch.
+    """
+    return get_embedding_model().encode(texts)
 
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
@@ -144,17 +212,20 @@ def compute_tech_keyword_overlap(resume: str, jd: str) -> float:
     return len(resume_tech) / len(jd_tech)
 
 
-def compute_features(resume_text: str, jd_text: str, role: str) -> Dict[str, float]:
+def compute_features(resume_text: str, jd_text: str, role: str,
+                     resume_emb: Optional[List[float]] = None, jd_emb: Optional[List[float]] = None) -> Dict[str, float]:
     """
     Computes all four features used by the ML model:
     1. Resume_JD_Sim: Cosine similarity of resume and JD embeddings
     2. Role_Resume_Sim: Cosine similarity of role and resume embeddings
     3. Word_Overlap: Jaccard similarity of word sets
     4. Tech_Keyword_Overlap: Technical keyword overlap ratio
+
+    Precomputed resume/JD embeddings (e.g. from the artifact store) are reused if given.
     """
     # Get embeddings
-    resume_emb = get_embedding(resume_text)
-    jd_emb = get_embedding(jd_text)
+    resume_emb = resume_emb if resume_emb is not None else get_embedding(resume_text)
+    jd_emb = jd_emb if jd_emb is not None else get_embedding(jd_text)
     role_emb = get_embedding(role)
     
     # Compute features
@@ -171,32 +242,92 @@ def compute_features(resume_text: str, jd_text: str, role: str) -> Dict[str, flo
     }
 
 
+def resolve_application_inputs(data: Dict) -> Dict:
+    """
+    Resolves the resume/JD inputs of a request body.
+    Full texts (`resumeText`, `jobDescription`) take precedence; otherwise the
+    `resumeId`/`jobId` returned by /api/parse-resume and /api/scrape-job are
+    looked up in the artifact store. Role and company default to the scraped ones.
+    
+    Raises LookupError if a referenced id is unknown or expired.
+    """
+    resume = job = None
+    
+    if not data.get('resumeText') and data.get('resumeId'):
+        resume = artifacts.get(data['resumeId'])
+        if resume is None or resume.kind != 'resume':
+            raise LookupError('Unknown or expired resumeId, please upload the resume again')
+    
+    if not data.get('jobDescription') and data.get('jobId'):
+        job = artifacts.get(data['jobId'])
+        if job is None or job.kind != 'job':
+            raise LookupError('Unknown or expired jobId, please scrape the job again')
+    
+    job_meta = job.meta if job else {}
+    return {
+        'resume': resume,
+        'job': job,
+        'resumeText': resume.text if resume else data.get('resumeText', ''),
+        'jobDescription': job.text if job else data.get('jobDescription', ''),
+        'role': data.get('role') or job_meta.get('role', ''),
+        'company': data.get('company') or job_meta.get('company', ''),
+    }
+
+
+def compute_application_features(inputs: Dict) -> Dict[str, float]:
+    """
+    Computes the model features for resolved application inputs.
+    When both texts come from the artifact store, their embeddings and the
+    resulting features are cached on the artifacts and reused across calls.
+    """
+    resume: Optional[Artifact] = inputs['resume']
+    job: Optional[Artifact] = inputs['job']
+    
+    if resume is None or job is None:
+        return compute_features(inputs['resumeText'], inputs['jobDescription'], inputs['role'])
+    
+    def features() -> Dict[str, float]:
+        resume_emb = artifacts.derive(resume, 'embedding', lambda: np.asarray(get_embedding(resume.text), dtype=np.float32))
+        jd_emb = artifacts.derive(job, 'embedding', lambda: np.asarray(get_embedding(job.text), dtype=np.float32))
+        return compute_features(resume.text, job.text, inputs['role'], resume_emb, jd_emb)
+    
+    return artifacts.derive(job, f"features:{resume.id}:{inputs['role']}", features)
+
+
+def load_legacy_bundle() -> ModelBundle:
+    """
+    Wraps the legacy model/scaler pickles as a bundle.
+    """
+    return ModelBundle(
+        ML_MODEL,
+        {'version': 'legacy', 'features': FEATURES, 'embeddingModel': EMBEDDING_MODEL},
+        joblib.load(ML_MODEL),
+        joblib.load(SCALER),
+    )
+
+
+# Live + shadow model bundles, hot-swapped in the background
+models = ModelRegistry(
+    live_path=MODEL_BUNDLE,
+    fallback=load_legacy_bundle,
+    embedding_model=EMBEDDING_MODEL,
+    poll_interval=MODEL_POLL_SECONDS,
+    shadow_log=SHADOW_LOG,
+    shap_grid_points=SHAP_GRID_POINTS,
+)
+
+
 def predict_with_shap(features: Dict[str, float]) -> Tuple[str, float, Dict[str, float]]:
     """
-    Runs prediction and computes SHAP values.
+    Runs prediction and computes SHAP values with the live model bundle,
+    and queues the features for the shadow bundle (if any).
     """
-    model = joblib.load(ML_MODEL)
-    scaler = joblib.load(SCALER)
-    # feature_array = np.array([[
-    #     features['Resume_JD_Sim'],
-    #     features['Role_Resume_Sim'],
-    #     features['Word_Overlap'],
-    #     features['Tech_Keyword_Overlap']
-    # ]])
-    feature_df = pd.DataFrame([{
-        'Resume_JD_Sim': features['Resume_JD_Sim'],
-        'Role_Resume_Sim': features['Role_Resume_Sim'],
-        'Word_Overlap': features['Word_Overlap'],
-        'Tech_Keyword_Overlap': features['Tech_Keyword_Overlap']
-    }])
-    
-    scaled_features = scaler.transform(feature_df)
-    scaled_features_df = pd.DataFrame(scaled_features, columns=feature_df.columns)
-    prediction = int(model.predict(scaled_features_df)[0])
-    probability = float(model.predict_proba(scaled_features_df)[0][1])
-    
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(scaled_features_df)[:,:,1][0]
+    bundle = models.live
+    predictions, probabilities, all_shap_values = bundle.predict([features])
+    prediction = int(predictions[0])
+    probability = float(probabilities[0])
+    shap_values = all_shap_values[0]
+    models.shadow(features, prediction, probability, bundle.version)
     
     # Mock values for testing purposes
     # avg_score = (
@@ -220,10 +351,7 @@ def predict_with_shap(features: Dict[str, float]) -> Tuple[str, float, Dict[str,
     # Normalize SHAP values by absolute sum
     abs_sum = np.sum(np.abs(shap_values))
     shap_values = shap_values / abs_sum if abs_sum != 0 else shap_values
-    shap_dict = { 'Resume_JD_Sim': float(shap_values[0]),
-                    'Role_Resume_Sim': float(shap_values[1]),
-                    'Word_Overlap': float(shap_values[2]),
-                    'Tech_Keyword_Overlap': float(shap_values[3]) }
+    shap_dict = {name: float(value) for name, value in zip(bundle.features, shap_values)}
 
     return prediction, probability, shap_dict
 
@@ -270,11 +398,14 @@ def generate_feedback(shap_values: Dict[str, float]) -> List[Dict]:
     return feedback
 
 
-def call_ollama(prompt: str, system_prompt: str = "") -> str:
+def call_ollama(prompt: str, system_prompt: str = "", options: Optional[Dict] = None, stats: Optional[Dict] = None) -> str:
     """
     Calls the local Ollama API for LLM inference.
     Make sure Ollama is running: ollama serve
     And the model is pulled: ollama pull llama3.2
+
+    @param options: Ollama model options (num_ctx, num_predict, ...)
+    @param stats: Optional dict that is filled with Ollama's token counts and timings
     """
     try:
         response = requests.post(
@@ -284,12 +415,24 @@ def call_ollama(prompt: str, system_prompt: str = "") -> str:
                 "prompt": prompt,
                 "system": system_prompt,
                 "stream": False,
+                "options": options or {},
+                "keep_alive": OLLAMA_KEEP_ALIVE,
             },
             timeout=120,  # LLM can take a while
         )
         
         if response.status_code == 200:
-            return response.json().get('response', '')
+            result = response.json()
+            if stats is not None:
+                # Ollama reports durations in nanoseconds
+                stats.update({
+                    'ollamaPromptTokens': result.get('prompt_eval_count', 0),
+                    'ollamaOutputTokens': result.get('eval_count', 0),
+                    'prefillMs': result.get('prompt_eval_duration', 0) / 1e6,
+                    'generationMs': result.get('eval_duration', 0) / 1e6,
+                    'ollamaTotalMs': result.get('total_duration', 0) / 1e6,
+                })
+            return result.get('response', '')
         else:
             return f"Error: Ollama returned status {response.status_code}"
             
@@ -299,6 +442,285 @@ def call_ollama(prompt: str, system_prompt: str = "") -> str:
         return f"Error: {str(e)}"
 
 
+# ====================
+# PROMPT BUDGETING
+# ====================
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens in a text.
+
+    Words are counted as one token per ~4 characters and punctuation as one token each,
+    which slightly overestimates llama3's BPE tokenizer and keeps the budget on the safe side.
+    """
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def _pack(pieces: List[str], max_tokens: int) -> List[str]:
+    """
+    Joins consecutive pieces with spaces into chunks of at most `max_tokens`
+    (a single piece larger than that becomes its own chunk).
+    """
+    chunks = []
+    current = ''
+    for piece in pieces:
+        candidate = f"{current} {piece}".strip()
+        if current and estimate_tokens(candidate) > max_tokens:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_sections(text: str, max_tokens: int = 120) -> List[str]:
+    """
+    Splits a text into sections (lines/bullets), breaking overly long lines on sentence boundaries,
+    and sentences that are still too long (e.g. unpunctuated single-line resumes) on word boundaries.
+    """
+    sections = []
+    for line in re.split(r'\n+', text):
+        line = line.strip()
+        if not line:
+            continue
+        if estimate_tokens(line) <= max_tokens:
+            sections.append(line)
+            continue
+        
+        for chunk in _pack(re.split(r'(?<=[.!?;])\s+', line), max_tokens):
+            if estimate_tokens(chunk) <= max_tokens:
+                sections.append(chunk)
+            else:
+                sections.extend(_pack(chunk.split(), max_tokens))
+    
+    return sections
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts a text to its first words fitting in `max_tokens`. Returns at least part of
+    the first word when `max_tokens` is positive, so the result is never empty.
+    """
+    words = text.split()
+    if max_tokens <= 0 or not words:
+        return ''
+    kept = _pack(words, max_tokens)[0]
+    if estimate_tokens(kept) > max_tokens:
+        kept = kept[:max_tokens * 4]
+    return kept
+
+
+def dedupe_sections(sections: List[str]) -> List[str]:
+    """
+    Drops repeated sections (e.g. boilerplate repeated across a job posting),
+    ignoring case, punctuation and whitespace differences.
+    """
+    seen = set()
+    unique = []
+    for section in sections:
+        key = re.sub(r'[\W_]+', ' ', section.lower()).strip()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        unique.append(section)
+    return unique
+
+
+def compress_text(text: str, query: str, max_tokens: int) -> str:
+    """
+    Fits a text into `max_tokens` by deduplicating its sections and keeping the ones
+    most similar to `query` (ranked by embedding), in their original order.
+    """
+    sections = dedupe_sections(split_sections(text))
+    costs = [estimate_tokens(section) for section in sections]
+    
+    if sum(costs) <= max_tokens:
+        return '\n'.join(sections)
+    
+    # The embedding model truncates long inputs, so the query is represented by
+    # the mean of its section embeddings rather than a single embedding
+    query_sections = split_sections(query) or [query]
+    embeddings = get_embeddings(sections + query_sections)
+    query_emb = embeddings[len(sections):].mean(axis=0)
+    scores = [cosine_similarity(emb, query_emb) for emb in embeddings[:len(sections)]]
+    
+    ranked = sorted(range(len(sections)), key=lambda i: scores[i], reverse=True)
+    keep = set()
+    used = 0
+    for i in ranked:
+        if used + costs[i] > max_tokens:
+            continue
+        keep.add(i)
+        used += costs[i]
+    
+    if not keep and max_tokens > 0:
+        # Budget smaller than every section: keep the start of the most relevant one
+        return truncate_tokens(sections[ranked[0]], max_tokens)
+    
+    return '\n'.join(sections[i] for i in sorted(keep))
+
+
+def prompt_input_budget(endpoint: str, *fixed_parts: str) -> int:
+    """
+    Returns how many tokens are left for the resume/JD inputs of an endpoint's prompt,
+    after reserving the generated output, the template and the other fixed parts.
+    """
+    options = OLLAMA_OPTIONS[endpoint]
+    reserved = options['num_predict'] + PROMPT_TEMPLATE_TOKENS + sum(estimate_tokens(part) for part in fixed_parts)
+    return max(options['num_ctx'] - reserved, 0)
+
+
+def prompt_stats(original_tokens: int, prompt_tokens: int, ollama_stats: Dict, started: float) -> Dict[str, float]:
+    """
+    Summarizes prompt-token savings and latency for an LLM endpoint.
+    The prefill saving is estimated from Ollama's measured prefill speed.
+    """
+    saved_tokens = max(original_tokens - prompt_tokens, 0)
+    ms_per_token = ollama_stats.get('prefillMs', 0) / max(ollama_stats.get('ollamaPromptTokens', 0), 1)
+    
+    return {
+        'originalTokens': original_tokens,
+        'promptTokens': prompt_tokens,
+        'savedTokens': saved_tokens,
+        'estimatedPrefillSavedMs': round(saved_tokens * ms_per_token, 1),
+        **ollama_stats,
+        'endToEndMs': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+# ====================
+# LLM SESSIONS
+# ====================
+
+class LLMSession:
+    """
+    Shared prompt prefix for the LLM calls of one application.
+
+    Tailoring and cover-letter prompts both start with the same system prompt and
+    job description (the resume comes after, since the cover letter is written from
+    the tailored resume). Ollama keeps the KV cache of the last prompt while the
+    model stays loaded, so follow-up calls only prefill the part after the prefix.
+    """
+
+    def __init__(self, key: str, job_prefix: str):
+        self.key = key
+        self.job_prefix = job_prefix
+        self.prefix_tokens = estimate_tokens(job_prefix)
+        self.calls = 0
+        self.ms_per_token = 0.0  # Prefill speed measured on the first (cold) call
+        self.tokens_per_estimate = 1.0  # Ollama's token count relative to estimate_tokens
+
+    def build_prompt(self, resume_text: str, task: str) -> str:
+        """
+        Lays out a prompt as shared prefix -> resume -> task-specific instructions.
+        """
+        return f"{self.job_prefix}\n\nCANDIDATE RESUME:\n{resume_text}\n\n{task}"
+
+    def record_call(self, prompt: str, stats: Dict) -> Dict[str, float]:
+        """
+        Records a call's prefill timings. For follow-up calls, estimates the prefill
+        time saved compared to the cold prefill speed measured on the first call.
+        """
+        self.calls += 1
+        evaluated = stats.get('ollamaPromptTokens', 0)
+        prefill_ms = stats.get('prefillMs', 0)
+        session_stats = {'sessionCall': self.calls, 'sharedPrefixTokens': self.prefix_tokens}
+        
+        if self.calls == 1 or not self.ms_per_token:
+            if evaluated:
+                self.ms_per_token = prefill_ms / evaluated
+                self.tokens_per_estimate = evaluated / max(estimate_tokens(prompt), 1)
+            return session_stats
+        
+        total_tokens = estimate_tokens(prompt) * self.tokens_per_estimate
+        cold_prefill_ms = total_tokens * self.ms_per_token
+        session_stats.update({
+            'cachedPromptTokens': round(max(total_tokens - evaluated, 0)),
+            'coldPrefillMs': round(cold_prefill_ms, 1),
+            'prefillSavedMs': round(max(cold_prefill_ms - prefill_ms, 0), 1),
+        })
+        return session_stats
+
+
+_llm_sessions: "OrderedDict[str, LLMSession]" = OrderedDict()
+_llm_sessions_lock = threading.Lock()
+
+
+def application_key(data: Dict, inputs: Dict) -> str:
+    """
+    Identifies the application a tailor/cover-letter call belongs to: the tracker
+    `applicationId` if given, else the candidate's original resume (`resumeId`, or a hash
+    of the resume text). The cover letter is written from the tailored resume, so the
+    frontend also sends the original `resumeId` to share the tailor call's session.
+    """
+    if data.get('applicationId'):
+        return f"application:{data['applicationId']}"
+    if data.get('resumeId'):
+        return f"resume:{data['resumeId']}"
+    return f"resume:{hashlib.sha256(inputs['resumeText'].encode('utf-8')).hexdigest()}"
+
+
+def resume_floor(resume_text: str, budget: int) -> int:
+    """
+    Smallest share of a call's budget the resume may get: all of it, or at least a third of the budget.
+    """
+    return min(estimate_tokens(resume_text), budget // 3)
+
+
+def get_llm_session(job_description: str, resume_text: str, budget: int, application: str) -> LLMSession:
+    """
+    Returns the LLM session of an application (see application_key) for a job description,
+    creating it on first use.
+
+    The JD is compressed once, when the session is created, so that every call of the
+    application reuses a byte-identical prefix. It gets whatever the resume leaves of the
+    smallest endpoint budget (at least a third), keeping the sections most similar to this
+    applicant's resume. If a later call's budget would still leave the resume less than its
+    floor (e.g. many extra instructions), the prefix is recompressed for that budget and
+    replaces the session's, so the resume is never squeezed out.
+    """
+    key = hashlib.sha256(f"{application}\n{job_description}".encode('utf-8')).hexdigest()
+    
+    with _llm_sessions_lock:
+        session = _llm_sessions.get(key)
+        if session is not None:
+            _llm_sessions.move_to_end(key)
+            if budget - session.prefix_tokens >= resume_floor(resume_text, budget):
+                return session
+    
+    session_budget = min(budget, *(prompt_input_budget(endpoint, APPLICATION_SYSTEM_PROMPT)
+                                   for endpoint in LLM_SESSION_ENDPOINTS))
+    jd_budget = max(session_budget - estimate_tokens(resume_text), session_budget // 3)
+    job_prefix = f"JOB DESCRIPTION:\n{compress_text(job_description, resume_text, jd_budget)}"
+    
+    with _llm_sessions_lock:
+        current = _llm_sessions.get(key)
+        if current is None or budget - current.prefix_tokens < resume_floor(resume_text, budget):
+            _llm_sessions[key] = LLMSession(key, job_prefix)
+        session = _llm_sessions[key]
+        _llm_sessions.move_to_end(key)
+        while len(_llm_sessions) > MAX_LLM_SESSIONS:
+            _llm_sessions.popitem(last=False)
+    
+    return session
+
+
+def fit_resume(session: LLMSession, resume_text: str, budget: int) -> str:
+    """
+    Fits the resume into what is left of the budget after the session's JD prefix
+    (never less than its floor, see resume_floor).
+    """
+    resume_budget = max(budget - session.prefix_tokens, resume_floor(resume_text, budget), 1)
+    if estimate_tokens(resume_text) <= resume_budget:
+        return resume_text
+    return compress_text(resume_text, session.job_prefix, resume_budget)
+
+
 # ====================
 # API ENDPOINTS
 # ====================
@@ -309,7 +731,7 @@ def parse_resume():
     Endpoint: Parse uploaded PDF resume
     Accepts a PDF file and extracts text content.
     Request: multipart/form-data with 'file' field
-    Response: { rawText: string, cleanedText: string }
+    Response: { resumeId: string, rawText: string, cleanedText: string }
     """
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
@@ -337,8 +759,10 @@ def parse_resume():
             raw_text = f"[PDF text extraction requires PyPDF2. Install with: pip install pypdf2]\n\nFilename: {file.filename}"
         
         cleaned_text = clean_text(raw_text)
+        resume_id = artifacts.put('resume', cleaned_text, {'fileName': file.filename})
         
         return jsonify({
+            'resumeId': resume_id,
             'rawText': raw_text,
             'cleanedText': cleaned_text,
         })
@@ -355,7 +779,7 @@ def scrape_job():
     Scrapes the job URL and uses LLM to summarize/augment the JD
     to match training data format (as noted in preprocessing.ipynb).
     Request: { url: string }
-    Response: { role: string, description: string, augmentedDescription: string, company: string }
+    Response: { jobId: string, role: string, description: string, augmentedDescription: string, company: string }
     """
     data = request.get_json()
     url = data.get('url', '')
@@ -363,6 +787,8 @@ def scrape_job():
     if not url:
         return jsonify({'error': 'No URL provided'}), 400
     
+    started = time.perf_counter()
+    
     try:
         # Try to scrape the URL
         try:
@@ -398,13 +824,18 @@ def scrape_job():
             description = f"Could not scrape URL: {str(scrape_error)}"
             company = "Company Unidentified"
 
+        # Keep the JD within the prompt budget, preferring sections closest to the role
+        system_prompt = "You are a job description writer. Extract and write key information concisely."
+        budget = prompt_input_budget('scrape', system_prompt, role)
+        prompt_description = compress_text(description, role, budget)
+
         # Augment/summarize the JD using LLM (as per preprocessing.ipynb solution)
         augment_prompt = f"""
         Given this job posting, extract and restructure the key responsibilities and requirements in the format below.
         Output should be in English.
 
         Job Title: {role}
-        Job Description: {description}
+        Job Description: {prompt_description}
 
         Format the output as:
         Key Responsibilities:
@@ -417,19 +848,29 @@ def scrape_job():
         - [list qualifications]
         """
 
-        augmented = call_ollama(
-            augment_prompt,
-            "You are a job description writer. Extract and write key information concisely."
-        )
+        ollama_stats = {}
+        augmented = call_ollama(augment_prompt, system_prompt, OLLAMA_OPTIONS['scrape'], ollama_stats)
         
         if augmented.startswith('Error:'):
             augmented = description[:500]  # Fallback to truncated original
         
+        # The augmented description is what later calls match against
+        job_id = artifacts.put('job', augmented, {
+            'role': role,
+            'company': company,
+            'description': description,
+            'sourceUrl': url,
+        })
+        
         return jsonify({
+            'jobId': job_id,
             'role': role,
             'description': description,
             'augmentedDescription': augmented,
             'company': company,
+            'promptStats': prompt_stats(
+                estimate_tokens(description), estimate_tokens(prompt_description), ollama_stats, started
+            ),
         })
         
     except Exception as e:
@@ -442,20 +883,25 @@ def predict():
     """
     Endpoint: Run ML prediction with SHAP explainability
     Computes features, runs prediction, and generates SHAP-based feedback.
-    Request: { resumeText: string, jobDescription: string, role: string }
-    Response: { prediction: string, selectProbability: float, featureScores: {...}, shapValues: {...}, feedback: [...] }
+    The scores are recorded in the tracker: as a new application for `userId`, or on the
+    given `applicationId` when re-running the prediction of an already tracked application.
+    Request: { resumeText | resumeId: string, jobDescription | jobId: string, role: string,
+               userId?: string, company?: string, jobUrl?: string, applicationId?: string }
+    Response: { prediction: string, selectProbability: float, featureScores: {...}, shapValues: {...}, feedback: [...], applicationId: string }
     """
     data = request.get_json()
-    resume_text = data.get('resumeText', '')
-    job_description = data.get('jobDescription', '')
-    role = data.get('role', '')
     
-    if not resume_text or not job_description:
+    try:
+        inputs = resolve_application_inputs(data)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    if not inputs['resumeText'] or not inputs['jobDescription']:
         return jsonify({'error': 'Missing resume or job description'}), 400
     
     try:
         # Step 1: Compute features (from preprocessing.ipynb)
-        features = compute_features(resume_text, job_description, role)
+        features = compute_application_features(inputs)
         
         # Step 2: Run prediction with SHAP (from training.ipynb)
         prediction, probability, shap_values = predict_with_shap(features)
@@ -463,12 +909,32 @@ def predict():
         # Step 3: Generate human-readable feedback
         feedback = generate_feedback(shap_values)
         
+        # Step 4: Record the scores in the tracker (queued, the request does not wait on the write)
+        application_id = data.get('applicationId')
+        if application_id:
+            tracker.update_scores(application_id, prediction, probability, features, shap_values)
+        else:
+            job_meta = inputs['job'].meta if inputs['job'] else {}
+            application_id = tracker.add_application(
+                data.get('userId', 'default'),
+                role=inputs['role'],
+                company=inputs['company'],
+                job_url=data.get('jobUrl') or job_meta.get('sourceUrl', ''),
+                prediction=prediction,
+                select_probability=probability,
+                feature_scores=features,
+                shap_values=shap_values,
+                resume_id=data.get('resumeId'),
+                job_id=data.get('jobId'),
+            )
+        
         return jsonify({
             'prediction': prediction,
             'selectProbability': probability,
             'featureScores': features,
             'shapValues': shap_values,
             'feedback': feedback,
+            'applicationId': application_id,
         })
         
     except Exception as e:
@@ -488,20 +954,27 @@ def tailor_resume():
     - Word_Overlap: Include more exact words from the JD
     - Tech_Keyword_Overlap: Include more tech keywords from the tech_keywords list 
     
-    Request: { resumeText: string, jobDescription: string, feedback: [...], shapValues: {...}, role: string }
+    Request: { resumeText | resumeId: string, jobDescription | jobId: string, feedback: [...], shapValues: {...}, role: string, applicationId?: string }
     Response: { content: string, improvements: [...] }
     """
     data = request.get_json()
     
-    resume_text = data.get('resumeText', '')
-    job_description = data.get('jobDescription', '')
+    try:
+        inputs = resolve_application_inputs(data)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    resume_text = inputs['resumeText']
+    job_description = inputs['jobDescription']
     feedback = data.get('feedback', [])
     shap_values = data.get('shapValues', {})
-    role = data.get('role', '')
+    role = inputs['role']
     
     if not resume_text:
         return jsonify({'error': 'Missing resume text'}), 400
     
+    started = time.perf_counter()
+    
     try:
         # Build feature-specific improvement instructions based on SHAP values
         improvements_needed = []
@@ -558,14 +1031,14 @@ def tailor_resume():
                 f"Add these technical skills and tools where relevant to your experience."
             )
         
-        # Build the prompt with feature-specific instructions
-        prompt = f"""You are a professional resume writer. Rewrite the following resume to better match the job description.
-
-        ORIGINAL RESUME:
-        {resume_text}
+        # Fit the resume and JD into the context window left after the instructions
+        budget = prompt_input_budget('tailor', APPLICATION_SYSTEM_PROMPT, role, *improvements_needed, *specific_instructions)
+        session = get_llm_session(job_description, resume_text, budget, application_key(data, inputs))
+        prompt_resume = fit_resume(session, resume_text, budget)
 
-        JOB DESCRIPTION:
-        {job_description}
+        # Build the task with feature-specific instructions
+        task = f"""TASK: You are a professional resume writer. Rewrite the candidate resume above to better match the job description.
+        Focus on the specific improvement areas mentioned below.
 
         JOB ROLE: {role}
 
@@ -584,14 +1057,16 @@ def tailor_resume():
 
         OUTPUT the improved resume only, no explanations or commentary."""
 
-        tailored_content = call_ollama(
-            prompt,
-            "You are an expert resume writer who creates ATS-optimized resumes. Output only the resume content, no meta-commentary. Focus on the specific improvement areas mentioned."
-        )
+        prompt = session.build_prompt(prompt_resume, task)
+        ollama_stats = {}
+        tailored_content = call_ollama(prompt, APPLICATION_SYSTEM_PROMPT, OLLAMA_OPTIONS['tailor'], ollama_stats)
         
         if tailored_content.startswith('Error:'):
             return jsonify({'error': tailored_content}), 500
         
+        if data.get('applicationId'):
+            tracker.add_artifact(data['applicationId'], 'tailored_resume', tailored_content)
+        
         # Build improvements list based on what was addressed
         improvements = []
         if shap_values.get('Resume_JD_Sim', 0) < 0:
@@ -612,6 +1087,15 @@ def tailor_resume():
         return jsonify({
             'content': tailored_content,
             'improvements': improvements,
+            'promptStats': {
+                **prompt_stats(
+                    estimate_tokens(resume_text) + estimate_tokens(job_description),
+                    estimate_tokens(prompt_resume) + session.prefix_tokens,
+                    ollama_stats,
+                    started,
+                ),
+                **session.record_call(prompt, ollama_stats),
+            },
         })
         
     except Exception as e:
@@ -625,19 +1109,28 @@ def generate_cover_letter():
     Endpoint: Generate cover letter using Ollama LLM
     Creates a personalized cover letter based on the tailored resume.
     Uses SHAP feedback to emphasize areas that need highlighting.
-    Request: { resumeText: string, jobDescription: string, role: string, company: string, shapValues: {...} }
+    Request: { resumeText | resumeId: string, jobDescription | jobId: string, role: string, company: string, shapValues: {...}, applicationId?: string }
+             (with the tailored resume as resumeText, also send the original resumeId to reuse the tailor call's session)
     Response: { content: string, keyPointsAddressed: [...] }
     """
     data = request.get_json()
-    resume_text = data.get('resumeText', '')
-    job_description = data.get('jobDescription', '')
-    role = data.get('role', 'the position')
-    company = data.get('company', 'your company')
+    
+    try:
+        inputs = resolve_application_inputs(data)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    resume_text = inputs['resumeText']
+    job_description = inputs['jobDescription']
+    role = inputs['role'] or 'the position'
+    company = inputs['company'] or 'your company'
     shap_values = data.get('shapValues', {})
     
     if not resume_text:
         return jsonify({'error': 'Missing resume text'}), 400
     
+    started = time.perf_counter()
+    
     try:
         # Build feature-specific instructions based on SHAP values
         emphasis_areas = []
@@ -704,18 +1197,18 @@ def generate_cover_letter():
                 "Cultural fit indicators",
             ]
         
-        # Build the prompt with feature-specific instructions
-        prompt = f"""Write a professional cover letter for the following job application.
+        # Fit the resume and JD into the context window left after the instructions
+        budget = prompt_input_budget('cover_letter', APPLICATION_SYSTEM_PROMPT, role or '', company or '', *emphasis_areas, *specific_instructions)
+        session = get_llm_session(job_description, resume_text, budget, application_key(data, inputs))
+        prompt_resume = fit_resume(session, resume_text, budget)
+
+        # Build the task with feature-specific instructions
+        task = f"""TASK: You are an expert cover letter writer. Write a professional cover letter for this job application,
+        highlighting the candidate's relevant experience with terminology aligned with the job description.
 
         POSITION: {role}
         COMPANY: {company if company else 'the company'}
 
-        JOB REQUIREMENTS:
-        {job_description}
-
-        CANDIDATE'S QUALIFICATIONS (from resume):
-        {resume_text}
-
         {f"AREAS TO EMPHASIZE (based on AI/SHAP analysis):" if emphasis_areas else ""}
         {chr(10).join('- ' + area for area in emphasis_areas) if emphasis_areas else ''}
 
@@ -733,17 +1226,28 @@ def generate_cover_letter():
 
         OUTPUT the cover letter only, no explanations or commentary."""
 
-        cover_letter = call_ollama(
-            prompt,
-            "You are an expert cover letter writer. Create compelling, personalized cover letters that highlight relevant experience and use terminology aligned with the job description."
-        )
+        prompt = session.build_prompt(prompt_resume, task)
+        ollama_stats = {}
+        cover_letter = call_ollama(prompt, APPLICATION_SYSTEM_PROMPT, OLLAMA_OPTIONS['cover_letter'], ollama_stats)
         
         if cover_letter.startswith('Error:'):
             return jsonify({'error': cover_letter}), 500
         
+        if data.get('applicationId'):
+            tracker.add_artifact(data['applicationId'], 'cover_letter', cover_letter)
+        
         return jsonify({
             'content': cover_letter,
             'keyPointsAddressed': key_points,
+            'promptStats': {
+                **prompt_stats(
+                    estimate_tokens(resume_text) + estimate_tokens(job_description),
+                    estimate_tokens(prompt_resume) + session.prefix_tokens,
+                    ollama_stats,
+                    started,
+                ),
+                **session.record_call(prompt, ollama_stats),
+            },
         })
         
     except Exception as e:
@@ -751,10 +1255,94 @@ def generate_cover_letter():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/applications', methods=['POST'])
+def create_application():
+    """
+    Endpoint: Add an application to the tracker
+    The write is queued and committed in the background, the id is returned immediately.
+    Request: { userId: string, role: string, company: string, jobUrl: string, status: string,
+               prediction: int, selectProbability: float, featureScores: {...}, shapValues: {...}, resumeId: string, jobId: string }
+    Response: { id: string }
+    """
+    data = request.get_json()
+    
+    try:
+        application_id = tracker.add_application(
+            data.get('userId', 'default'),
+            role=data.get('role', ''),
+            company=data.get('company', ''),
+            job_url=data.get('jobUrl', ''),
+            status=data.get('status', 'pending'),
+            prediction=data.get('prediction'),
+            select_probability=data.get('selectProbability'),
+            feature_scores=data.get('featureScores'),
+            shap_values=data.get('shapValues'),
+            resume_id=data.get('resumeId'),
+            job_id=data.get('jobId'),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'id': application_id}), 202
+
+
+@app.route('/api/applications', methods=['GET'])
+def list_applications():
+    """
+    Endpoint: List tracked applications, newest first
+    Request: ?userId=&status=&from=&to=&limit=&cursor=  (from/to are ISO dates, cursor is the previous page's nextCursor)
+    Response: { items: [...], nextCursor: string | null }
+    """
+    status = request.args.get('status')
+    if status and status not in STATUSES:
+        return jsonify({'error': f"Invalid status '{status}'"}), 400
+    
+    try:
+        page = tracker.list_applications(
+            request.args.get('userId', 'default'),
+            status=status,
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+            limit=request.args.get('limit', 50, type=int),
+            cursor=request.args.get('cursor'),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(page)
+
+
+@app.route('/api/applications/<application_id>', methods=['GET'])
+def get_application(application_id):
+    """
+    Endpoint: Get a tracked application with its scores, SHAP values and generated artifacts
+    """
+    application = tracker.get_application(application_id)
+    if application is None:
+        return jsonify({'error': 'Application not found'}), 404
+    return jsonify(application)
+
+
+@app.route('/api/applications/<application_id>', methods=['PATCH'])
+def update_application(application_id):
+    """
+    Endpoint: Update the status of a tracked application
+    Request: { status: string }
+    """
+    data = request.get_json()
+    
+    try:
+        tracker.update_status(application_id, data.get('status', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'id': application_id, 'status': data['status']}), 202
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'ok', 'model': OLLAMA_MODEL})
+    return jsonify({'status': 'ok', 'model': OLLAMA_MODEL, 'mlModel': models.stats()})
 
 
 # ====================
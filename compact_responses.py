@@ -0,0 +1,285 @@
+"""
+Compact JSON responses for the backend (a Flask extension, used like CORS(app)).
+
+Every JSON response gets:
+    ?fields=a,b       opt-in field selection: only these top-level keys are returned
+                      (e.g. ?fields=resumeId,cleanedText drops rawText from /api/parse-resume)
+    ETag / 304        a weak ETag of the body; a request whose If-None-Match matches it gets
+                      304 Not Modified with no body. Only for GET/HEAD, plus the POST endpoints
+                      listed in `revalidated_posts`: by HTTP semantics a POST is not cacheable,
+                      so this is an exception limited to endpoints that are deterministic in
+                      their request body (e.g. /api/predict) and whose bodies carry no timings
+    gzip / br         response compression negotiated from Accept-Encoding, for bodies of at
+                      least min_size bytes (brotli needs the optional `brotli` package)
+
+Error responses (4xx/5xx) are left untouched.
+
+The benchmark sends a request through a local proxy that throttles bandwidth and adds
+latency like a slow tunnel (ngrok), and compares payload size and latency per variant.
+
+Usage:
+    python compact_responses.py benchmark --url http://localhost:5000 --endpoint /api/parse-resume \
+        --file resume.pdf --fields resumeId,cleanedText --bandwidth-kbps 1000 --rtt-ms 150
+    python compact_responses.py benchmark --url http://localhost:5000 --endpoint /api/predict \
+        --json predict_request.json --direct
+"""
+import gzip
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+import statistics
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from flask import Flask, Response, json as flask_json, request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/html', 'text/csv')
+
+
+class CompactResponses:
+    """
+    Registers an after_request hook that applies field selection, ETag/304 and compression.
+    """
+
+    def __init__(self, app: Optional[Flask] = None, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 revalidated_posts: Tuple[str, ...] = ()):
+        """
+        @param min_size: smallest body (bytes) worth compressing
+        @param brotli_quality: 0-11; on resume/JD text, 5 is ~10% smaller than gzip -6 at a similar speed
+        @param revalidated_posts: paths of deterministic POST endpoints that get ETags/304 like a GET
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.revalidated_posts = set(revalidated_posts)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.after_request(self.process)
+
+    @property
+    def encodings(self) -> List[str]:
+        """
+        Supported content codings, in order of preference.
+        """
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    def process(self, response: Response) -> Response:
+        if response.direct_passthrough or response.status_code >= 400 or response.status_code in (204, 304):
+            return response
+
+        if response.is_json:
+            fields = request.args.get('fields')
+            if fields:
+                self.select_fields(response, [field.strip() for field in fields.split(',') if field.strip()])
+
+            if response.status_code == 200 and self.revalidates(request.method, request.path):
+                response.add_etag(weak=True)
+                etag, _ = response.get_etag()
+                if request.if_none_match.contains_weak(etag):
+                    response.status_code = 304
+                    response.set_data(b'')
+                    response.headers.pop('Content-Type', None)
+                    return response
+
+        if response.mimetype in COMPRESSIBLE_MIMETYPES:
+            self.compress(response)
+        return response
+
+    def revalidates(self, method: str, path: str) -> bool:
+        """
+        Whether responses to this request get an ETag and may be answered with 304.
+        """
+        return method in ('GET', 'HEAD') or (method == 'POST' and path in self.revalidated_posts)
+
+    def select_fields(self, response: Response, fields: List[str]):
+        """
+        Keeps only the requested top-level keys of a JSON object body; unknown keys are ignored.
+        """
+        data = response.get_json(silent=True)
+        if isinstance(data, dict):
+            response.set_data(flask_json.dumps({field: data[field] for field in fields if field in data}))
+
+    def compress(self, response: Response):
+        response.vary.add('Accept-Encoding')
+        if 'Content-Encoding' in response.headers:
+            return
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return
+
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding == 'br':
+            body = brotli.compress(body, quality=self.brotli_quality)
+        elif encoding == 'gzip':
+            body = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        else:
+            return
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+
+
+# ====================
+# BENCHMARK
+# ====================
+
+class ThrottledProxy:
+    """
+    Local TCP proxy emulating a slow tunnel: each direction is limited to bandwidth_kbps
+    and every chunk is delayed by half the round trip time.
+    """
+
+    def __init__(self, target_host: str, target_port: int, bandwidth_kbps: float, rtt_ms: float):
+        self.target = (target_host, target_port)
+        self.bytes_per_second = bandwidth_kbps * 1000 / 8
+        self.one_way_delay = rtt_ms / 2000
+        self.server = socket.create_server(('127.0.0.1', 0))
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.server.accept()
+            upstream = socket.create_connection(self.target)
+            for source, destination in ((client, upstream), (upstream, client)):
+                chunks = queue.Queue()
+                threading.Thread(target=self._read, args=(source, chunks), daemon=True).start()
+                threading.Thread(target=self._write, args=(destination, chunks), daemon=True).start()
+
+    def _read(self, source: socket.socket, chunks: queue.Queue):
+        next_free = 0.0
+        while True:
+            try:
+                chunk = source.recv(16384)
+            except OSError:
+                chunk = b''
+            if not chunk:
+                chunks.put((0.0, None))
+                return
+            # Delivered after the link delay, once the link has finished sending earlier chunks
+            next_free = max(time.perf_counter() + self.one_way_delay, next_free) + len(chunk) / self.bytes_per_second
+            chunks.put((next_free, chunk))
+
+    def _write(self, destination: socket.socket, chunks: queue.Queue):
+        while True:
+            deliver_at, chunk = chunks.get()
+            if chunk is None:
+                try:
+                    destination.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+                return
+            time.sleep(max(0.0, deliver_at - time.perf_counter()))
+            try:
+                destination.sendall(chunk)
+            except OSError:
+                return
+
+
+def decode(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == 'br':
+        return brotli.decompress(body)
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    return body
+
+
+def benchmark(url: str, endpoint: str, file_path: Optional[str], json_path: Optional[str], fields: Optional[str],
+              bandwidth_kbps: float, rtt_ms: float, direct: bool, repeat: int):
+    """
+    Measures wire bytes and end-to-end latency (median of `repeat` requests) per response variant.
+    """
+    import requests
+
+    if direct:
+        base_url = url.rstrip('/')
+        print(f"Direct to {base_url}")
+    else:
+        target = urlparse(url)
+        proxy = ThrottledProxy(target.hostname, target.port or 80, bandwidth_kbps, rtt_ms)
+        base_url = f"http://127.0.0.1:{proxy.port}"
+        print(f"Through a throttled link to {url}: {bandwidth_kbps:g} kbit/s, {rtt_ms:g}ms RTT")
+
+    body = None
+    if json_path:
+        with open(json_path, 'r', encoding='utf-8') as file:
+            body = json.load(file)
+
+    def send(session, encoding: str, params: Dict[str, str], etag: Optional[str] = None) -> Tuple[float, int, int, Optional[str]]:
+        headers = {'Accept-Encoding': encoding}
+        if etag:
+            headers['If-None-Match'] = etag
+        started = time.perf_counter()
+        if file_path:
+            with open(file_path, 'rb') as file:
+                response = session.post(base_url + endpoint, params=params, headers=headers, stream=True,
+                                         files={'file': (file_path.rsplit('/', 1)[-1], file, 'application/pdf')})
+        elif body is not None:
+            response = session.post(base_url + endpoint, params=params, headers=headers, stream=True, json=body)
+        else:
+            response = session.get(base_url + endpoint, params=params, headers=headers, stream=True)
+        wire = response.raw.read(decode_content=False)
+        decoded = decode(wire, response.headers.get('Content-Encoding'))
+        elapsed = time.perf_counter() - started
+        if response.status_code not in (200, 304):
+            raise SystemExit(f"{endpoint} returned {response.status_code}: {decoded[:200]!r}")
+        return elapsed, len(wire), len(decoded), response.headers.get('ETag')
+
+    variants = [('full, identity', 'identity', {})]
+    variants += [(f"full, {encoding}", encoding, {}) for encoding in reversed(CompactResponses().encodings)]
+    if fields:
+        variants += [(f"fields, {encoding}", encoding, {'fields': fields}) for encoding in ['identity'] + list(reversed(CompactResponses().encodings))]
+
+    session = requests.Session()
+    send(session, 'identity', {})  # Warm up the backend (models, caches)
+
+    print(f"{'variant':<26} {'wire bytes':>12} {'json bytes':>12} {'median ms':>10}")
+    baseline = None
+    for name, encoding, params in variants:
+        runs = [send(session, encoding, params) for _ in range(repeat)]
+        latency = statistics.median(run[0] for run in runs) * 1000
+        baseline = baseline or (runs[0][1], latency)
+        print(f"{name:<26} {runs[0][1]:12,d} {runs[0][2]:12,d} {latency:10.1f}"
+              f"   ({runs[0][1] / baseline[0]:.0%} bytes, {latency / baseline[1]:.0%} time)")
+
+    # Revalidation of an identical repeated request
+    encoding = CompactResponses().encodings[0]
+    _, _, _, etag = send(session, encoding, {})
+    if not etag:
+        print(f"{endpoint} sends no ETag (POST endpoints only do if listed in revalidated_posts)")
+        return
+    runs = [send(session, encoding, {}, etag) for _ in range(repeat)]
+    latency = statistics.median(run[0] for run in runs) * 1000
+    print(f"{'repeat, If-None-Match':<26} {runs[0][1]:12,d} {runs[0][2]:12,d} {latency:10.1f}"
+          f"   ({runs[0][1] / baseline[0]:.0%} bytes, {latency / baseline[1]:.0%} time)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compact JSON responses')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench = subparsers.add_parser('benchmark', help='Compare payload size and latency over a slow link')
+    bench.add_argument('--url', default='http://localhost:5000', help='Backend base URL')
+    bench.add_argument('--endpoint', default='/api/parse-resume')
+    bench.add_argument('--file', help='PDF to upload as multipart "file" (e.g. for /api/parse-resume)')
+    bench.add_argument('--json', help='JSON request body file (e.g. for /api/predict)')
+    bench.add_argument('--fields', help='Field selection to compare against the full response')
+    bench.add_argument('--bandwidth-kbps', type=float, default=1000, help='Emulated link bandwidth per direction')
+    bench.add_argument('--rtt-ms', type=float, default=150, help='Emulated round trip time')
+    bench.add_argument('--direct', action='store_true', help='Skip the emulated link (e.g. to measure a real tunnel URL)')
+    bench.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        benchmark(args.url, args.endpoint, args.file, args.json, args.fields,
+                  args.bandwidth_kbps, args.rtt_ms, args.direct, args.repeat)
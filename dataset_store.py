@@ -0,0 +1,273 @@
+"""
+Columnar storage for the embedded resume screening dataset.
+
+Replaces `embedded_resume_screening_dataset.pkl` (one numpy array object per row and
+embedding column) with a directory holding:
+    columns.parquet          text/scalar columns (+ Role_Index into the role matrix)
+    resume_embeddings.npy    contiguous float32 matrix, one row per dataset row
+    jd_embeddings.npy        contiguous float32 matrix, one row per dataset row
+    role_embeddings.npy      one row per unique role (there are only a few)
+    manifest.json            row count, embedding dimension and column layout
+
+Embedding matrices are memory-mapped and parquet columns are read on first use, one
+column at a time, so opening the dataset is near instant and only the columns actually
+used are loaded (e.g. the Decision labels without the resume/JD texts).
+
+Usage:
+    python dataset_store.py convert data/embedded_resume_screening_dataset.pkl data/embedded_resume_screening_dataset
+    python dataset_store.py benchmark data/embedded_resume_screening_dataset.pkl data/embedded_resume_screening_dataset
+"""
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+FORMAT_VERSION = 1
+
+# Embedding column -> file of its (rows x dim) matrix
+EMBEDDING_COLUMNS = {
+    'Resume_Embeddings': 'resume_embeddings.npy',
+    'JD_Embeddings': 'jd_embeddings.npy',
+}
+
+# Embedding column -> (key column, file of the unique matrix, index column)
+DEDUPED_EMBEDDING_COLUMNS = {
+    'Role_Embeddings': ('Role', 'role_embeddings.npy', 'Role_Index'),
+}
+
+RowSelector = Union[int, slice, Sequence[int], np.ndarray]
+
+
+def save_dataset(df: pd.DataFrame, path: str):
+    """
+    Saves a dataframe with per-row embedding arrays in the columnar format.
+    """
+    os.makedirs(path, exist_ok=True)
+    df = df.reset_index(drop=True)
+    embedding_dim = None
+    layout = {'embeddings': {}, 'deduped_embeddings': {}}
+
+    for column, filename in EMBEDDING_COLUMNS.items():
+        if column not in df:
+            continue
+        matrix = np.ascontiguousarray(np.stack(df[column].to_numpy()), dtype=np.float32)
+        np.save(os.path.join(path, filename), matrix)
+        embedding_dim = matrix.shape[1]
+        layout['embeddings'][column] = filename
+        df = df.drop(columns=column)
+
+    for column, (key_column, filename, index_column) in DEDUPED_EMBEDDING_COLUMNS.items():
+        if column not in df:
+            continue
+        # Same key -> same embedding, so keep the first embedding of each key.
+        # Missing keys get a code of their own (the default -1 sentinel would shift every index)
+        codes, _ = pd.factorize(df[key_column], use_na_sentinel=False)
+        _, first_rows = np.unique(codes, return_index=True)
+        matrix = np.ascontiguousarray(np.stack(df[column].to_numpy()[first_rows]), dtype=np.float32)
+        np.save(os.path.join(path, filename), matrix)
+        layout['deduped_embeddings'][column] = {'key': key_column, 'file': filename, 'index': index_column}
+        df = df.drop(columns=column)
+        df[index_column] = codes.astype(np.int32)
+
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), os.path.join(path, 'columns.parquet'))
+
+    with open(os.path.join(path, 'manifest.json'), 'w') as file:
+        json.dump({
+            'version': FORMAT_VERSION,
+            'rows': len(df),
+            'embeddingDim': embedding_dim,
+            'columns': list(df.columns),
+            **layout,
+        }, file, indent=4)
+
+
+class EmbeddedDataset:
+    """
+    Lazily loaded, row-sliceable view of a dataset saved with save_dataset.
+
+        ds = EmbeddedDataset("data/embedded_resume_screening_dataset")
+        ds.embeddings('Resume_Embeddings')   # memory-mapped (rows x dim) float32 matrix
+        ds[:1000].frame(['Role', 'Decision']) # first 1000 rows of two columns
+    """
+
+    def __init__(self, path: str, rows: Optional[np.ndarray] = None, mmap: bool = True):
+        self.path = path
+        self.mmap = mmap
+        with open(os.path.join(path, 'manifest.json'), 'r') as file:
+            self.manifest = json.load(file)
+        self._rows = rows  # None means every row
+        self._columns: Dict[str, pa.ChunkedArray] = {}  # Parquet columns read so far, shared with views
+        self._matrices: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.manifest['rows'] if self._rows is None else len(self._rows)
+
+    def __getitem__(self, selector: RowSelector) -> 'EmbeddedDataset':
+        """
+        Returns a view over a subset of rows (int, slice, or array of positions/booleans).
+        """
+        positions = np.arange(len(self))[selector]
+        positions = np.atleast_1d(positions)
+        view = EmbeddedDataset.__new__(EmbeddedDataset)
+        view.__dict__.update(self.__dict__)
+        view._rows = positions if self._rows is None else self._rows[positions]
+        return view
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.manifest['columns']) + list(self.manifest['embeddings']) + list(self.manifest['deduped_embeddings'])
+
+    def _matrix(self, filename: str) -> np.ndarray:
+        if filename not in self._matrices:
+            self._matrices[filename] = np.load(os.path.join(self.path, filename), mmap_mode='r' if self.mmap else None)
+        return self._matrices[filename]
+
+    def _table_rows(self, columns: List[str]) -> pa.Table:
+        """
+        Returns the selected rows of some parquet columns, reading only columns not read before.
+        """
+        missing = [column for column in columns if column not in self._columns]
+        if missing:
+            read = pq.read_table(os.path.join(self.path, 'columns.parquet'), columns=missing, memory_map=True)
+            for column in missing:
+                self._columns[column] = read.column(column)
+
+        table = pa.table({column: self._columns[column] for column in columns})
+        if self._rows is None:
+            return table
+        if len(self._rows) and np.all(np.diff(self._rows) == 1):
+            return table.slice(int(self._rows[0]), len(self._rows))
+        return table.take(pa.array(self._rows))
+
+    def embeddings(self, column: str) -> np.ndarray:
+        """
+        Returns the (rows x dim) float32 matrix of an embedding column for the selected rows.
+        Contiguous row ranges stay memory-mapped; other selections are copied.
+        """
+        if column in self.manifest['embeddings']:
+            matrix = self._matrix(self.manifest['embeddings'][column])
+            if self._rows is None:
+                return matrix
+            if len(self._rows) and np.all(np.diff(self._rows) == 1):
+                return matrix[self._rows[0]:self._rows[-1] + 1]
+            return matrix[self._rows]
+
+        if column in self.manifest['deduped_embeddings']:
+            layout = self.manifest['deduped_embeddings'][column]
+            index = self._table_rows([layout['index']]).column(layout['index']).to_numpy()
+            return self._matrix(layout['file'])[index]
+
+        raise KeyError(f"Unknown embedding column '{column}'")
+
+    def unique_embeddings(self, column: str) -> np.ndarray:
+        """
+        Returns the deduplicated matrix of a column (e.g. one row per role); index it with its index column.
+        """
+        return self._matrix(self.manifest['deduped_embeddings'][column]['file'])
+
+    def frame(self, columns: Optional[List[str]] = None, embeddings_as_objects: bool = False) -> pd.DataFrame:
+        """
+        Materializes the selected rows as a dataframe.
+
+        By default only the parquet columns are returned. With embeddings_as_objects=True,
+        embedding columns are added as per-row arrays, like the original pickle.
+        """
+        table_columns = [c for c in (columns or self.manifest['columns']) if c in self.manifest['columns']]
+        df = self._table_rows(table_columns).to_pandas()
+
+        if embeddings_as_objects:
+            wanted = columns or list(self.manifest['embeddings']) + list(self.manifest['deduped_embeddings'])
+            for column in wanted:
+                if column in self.manifest['embeddings'] or column in self.manifest['deduped_embeddings']:
+                    df[column] = list(np.asarray(self.embeddings(column)))
+        return df
+
+
+def row_cosine_similarity(a: np.ndarray, b: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Cosine similarity between matching rows of two (rows x dim) matrices, computed in
+    chunks so memory-mapped matrices are streamed instead of loaded at once.
+    Vectorized replacement for the per-row compute_similarity in preprocessing.ipynb.
+    """
+    result = np.empty(len(a), dtype=np.float32)
+    for start in range(0, len(a), chunk_size):
+        x = np.asarray(a[start:start + chunk_size], dtype=np.float32)
+        y = np.asarray(b[start:start + chunk_size], dtype=np.float32)
+        norms = np.linalg.norm(x, axis=1) * np.linalg.norm(y, axis=1)
+        dots = np.einsum('ij,ij->i', x, y)
+        result[start:start + len(x)] = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+    return result
+
+
+def benchmark(pickle_path: str, path: str):
+    """
+    Compares the pickle against the columnar dataset on the same tasks, each starting
+    from files on disk (the pickle has to be fully loaded for any of them).
+    Memory is the peak traced by tracemalloc (numpy/Python allocations, not mmap'd pages).
+    """
+    import tracemalloc
+
+    def measure(label, task):
+        tracemalloc.start()
+        started = time.perf_counter()
+        task()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<60} {elapsed * 1000:10.1f}ms  peak {peak / 1024 ** 2:9.1f}MB")
+
+    def columnar_full_load():
+        ds = EmbeddedDataset(path, mmap=False)
+        ds.frame()
+        for column in list(ds.manifest['embeddings']) + list(ds.manifest['deduped_embeddings']):
+            ds.embeddings(column)
+
+    tasks = [
+        ('full load (everything in memory)',
+         lambda: pd.read_pickle(pickle_path),
+         columnar_full_load),
+        ('full load as a dataframe of per-row embeddings',
+         lambda: pd.read_pickle(pickle_path),
+         lambda: EmbeddedDataset(path).frame(embeddings_as_objects=True)),
+        ('Decision labels only',
+         lambda: pd.read_pickle(pickle_path)['Decision'],
+         lambda: EmbeddedDataset(path).frame(['Decision'])),
+        ('Resume-JD similarity, all rows',
+         lambda: row_cosine_similarity(*(np.stack(pd.read_pickle(pickle_path)[column].to_numpy())
+                                         for column in ('Resume_Embeddings', 'JD_Embeddings'))),
+         lambda: row_cosine_similarity(*(EmbeddedDataset(path).embeddings(column)
+                                         for column in ('Resume_Embeddings', 'JD_Embeddings')))),
+        ('Role_Embeddings matrix',
+         lambda: np.stack(pd.read_pickle(pickle_path)['Role_Embeddings'].to_numpy()),
+         lambda: EmbeddedDataset(path).embeddings('Role_Embeddings')),
+        ('rows 1000-2000, all columns',
+         lambda: pd.read_pickle(pickle_path).iloc[1000:2000],
+         lambda: EmbeddedDataset(path)[1000:2000].frame(embeddings_as_objects=True)),
+    ]
+    for label, pickle_task, columnar_task in tasks:
+        measure(f"pickle:   {label}", pickle_task)
+        measure(f"columnar: {label}", columnar_task)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Columnar storage for the embedded dataset')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert = subparsers.add_parser('convert', help='Convert a pickled dataframe to the columnar format')
+    convert.add_argument('pickle_path')
+    convert.add_argument('path')
+    bench = subparsers.add_parser('benchmark', help='Compare load time and memory against the pickle')
+    bench.add_argument('pickle_path')
+    bench.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        save_dataset(pd.read_pickle(args.pickle_path), args.path)
+        print(f"Saved {args.pickle_path} to {args.path}")
+    elif args.command == 'benchmark':
+        benchmark(args.pickle_path, args.path)
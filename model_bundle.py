@@ -0,0 +1,618 @@
+"""
+Versioned model bundles and the registry that serves them.
+
+A bundle is a directory under src/models/bundles/ (written by train.py). Two pointer
+files in that directory select what the backend serves:
+    CURRENT    name of the live bundle
+    SHADOW     name of a candidate bundle scored alongside the live one (optional)
+
+The backend polls the pointers and swaps bundles in the background, so a new model
+goes live without a restart.
+
+Usage:
+    python model_bundle.py list
+    python model_bundle.py promote src/models/bundles/<version>
+    python model_bundle.py shadow src/models/bundles/<version>
+    python model_bundle.py shadow --clear
+    python model_bundle.py shap-grid src/models/bundles/<version> --points 21
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+
+FEATURES = ['Resume_JD_Sim', 'Role_Resume_Sim', 'Word_Overlap', 'Tech_Keyword_Overlap']
+
+BUNDLES_DIR = "src/models/bundles"
+# Raw feature ranges covered by the SHAP lookup grid (two cosine similarities, two overlap ratios).
+# Rows outside these ranges are explained exactly.
+FEATURE_BOUNDS = {
+    'Resume_JD_Sim': (0.0, 1.0),
+    'Role_Resume_Sim': (0.0, 1.0),
+    'Word_Overlap': (0.0, 1.0),
+    'Tech_Keyword_Overlap': (0.0, 1.0),
+}
+
+CURRENT_POINTER = "CURRENT"  # File in BUNDLES_DIR holding the name of the live bundle
+SHADOW_POINTER = "SHADOW"  # File in BUNDLES_DIR holding the name of the shadow candidate
+
+
+class ModelBundle:
+    """
+    A trained model packaged with everything needed to serve it:
+
+        <bundle>/manifest.json    feature order, embedding model, metrics, params
+        <bundle>/model.joblib     fitted classifier
+        <bundle>/scaler.joblib    fitted StandardScaler
+        <bundle>/background.npy   sample of scaled training rows (SHAP background for non-tree models)
+    """
+
+    def __init__(self, path: str, manifest: Dict[str, Any], model, scaler, background: Optional[np.ndarray] = None):
+        self.path = path
+        self.manifest = manifest
+        self.model = model
+        self.scaler = scaler
+        self.background = background
+        self.features: List[str] = manifest['features']
+        self.version: str = manifest['version']
+        self.shap_grid: Optional['ShapGrid'] = None  # Optional lookup surface, see ShapGrid
+        self._explainer = None
+
+    @property
+    def explainer(self):
+        """
+        SHAP explainer, built once per bundle. Tree models use the exact TreeExplainer;
+        other models fall back to KernelExplainer over the stored background sample.
+        """
+        if self._explainer is None:
+            try:
+                self._explainer = shap.TreeExplainer(self.model)
+            except Exception:
+                if self.background is None:
+                    raise
+                self._explainer = shap.KernelExplainer(self.model.predict_proba, self.background)
+        return self._explainer
+
+    def scale(self, features: List[Dict[str, float]]) -> pd.DataFrame:
+        """
+        Scales raw feature dicts into a dataframe in the bundle's feature order.
+        """
+        feature_df = pd.DataFrame([[row[name] for name in self.features] for row in features], columns=self.features)
+        return pd.DataFrame(self.scaler.transform(feature_df), columns=self.features)
+
+    def score(self, features: List[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns predictions and 'select' probabilities, without SHAP values.
+        """
+        scaled = self.scale(features)
+        return self.model.predict(scaled), self.model.predict_proba(scaled)[:, 1]
+
+    def predict(self, features: List[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns predictions, 'select' probabilities and raw SHAP values (rows x features).
+        Predictions and probabilities always come from the model. With a SHAP grid, SHAP values
+        of rows inside the grid are interpolated and only the rest are explained exactly.
+        """
+        scaled = self.scale(features)
+        predictions = self.model.predict(scaled)
+        probabilities = self.model.predict_proba(scaled)[:, 1]
+        if self.shap_grid is None:
+            return predictions, probabilities, self.shap_values(scaled)
+
+        inside = self.shap_grid.contains(scaled.to_numpy())
+        shap_values = np.empty((len(scaled), len(self.features)))
+        shap_values[inside] = self.shap_grid.lookup(scaled.to_numpy()[inside])
+        if not inside.all():
+            shap_values[~inside] = self.shap_values(scaled[~inside])
+        return predictions, probabilities, shap_values
+
+    def shap_values(self, scaled: pd.DataFrame) -> np.ndarray:
+        """
+        SHAP values towards the 'select' class, as a (rows x features) array.
+        """
+        if isinstance(self.explainer, shap.KernelExplainer):
+            values = self.explainer.shap_values(scaled, silent=True)
+        else:
+            values = self.explainer.shap_values(scaled)
+        if isinstance(values, list):  # Older SHAP: one array per class
+            values = values[1]
+        values = np.asarray(values)
+        if values.ndim == 3:  # (rows, features, classes)
+            values = values[:, :, 1]
+        return values
+
+
+class ShapGrid:
+    """
+    Precomputed SHAP values on a regular grid over the scaled feature space, looked up
+    with multilinear interpolation (16 grid corners per row for four features), so
+    explaining a row costs the same whatever the model size.
+
+    The grid spans FEATURE_BOUNDS mapped through the bundle's scaler. Its accuracy is
+    estimated at build time against the exact explainer on random rows (see `error`).
+    """
+
+    def __init__(self, lower: np.ndarray, upper: np.ndarray, values: np.ndarray, error: Optional[Dict[str, float]] = None):
+        """
+        @param values: (points, ..., points, features) array of SHAP values per grid node
+        """
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.values = values
+        self.error = error or {}
+        self.points = values.shape[0]
+        self.step = (self.upper - self.lower) / (self.points - 1)
+        self._flat = values.reshape(-1, values.shape[-1])
+        # Flat offsets of the 2^d corners of a grid cell
+        dims = len(self.lower)
+        self._corners = np.array([[(corner >> d) & 1 for d in range(dims)] for corner in range(2 ** dims)])
+        self._corner_offsets = self._corners @ np.array([self.points ** (dims - 1 - d) for d in range(dims)])
+
+    @classmethod
+    def build(cls, bundle: ModelBundle, points: int = 21, bounds: Dict[str, Tuple[float, float]] = FEATURE_BOUNDS,
+              samples: int = 1000, chunk_size: int = 256) -> 'ShapGrid':
+        """
+        Evaluates the explainer on every grid node, then measures the interpolation
+        error on `samples` uniformly random rows inside the grid. TreeSHAP holds the GIL
+        for each chunk, so a server should build grids in a child process (see build_in_subprocess).
+        """
+        if points < 2:
+            raise ValueError(f"A SHAP grid needs at least 2 points per feature, got {points}")
+        raw_lower = pd.DataFrame([[bounds[name][0] for name in bundle.features]], columns=bundle.features)
+        raw_upper = pd.DataFrame([[bounds[name][1] for name in bundle.features]], columns=bundle.features)
+        lower = bundle.scaler.transform(raw_lower)[0]
+        upper = bundle.scaler.transform(raw_upper)[0]
+
+        axes = [np.linspace(lo, hi, points) for lo, hi in zip(lower, upper)]
+        nodes = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(axes))
+        values = np.empty((len(nodes), len(axes)), dtype=np.float32)
+        for start in range(0, len(nodes), chunk_size):
+            chunk = pd.DataFrame(nodes[start:start + chunk_size], columns=bundle.features)
+            values[start:start + len(chunk)] = bundle.shap_values(chunk)
+
+        grid = cls(lower, upper, values.reshape((points,) * len(axes) + (len(axes),)))
+
+        rng = np.random.default_rng(0)
+        sample = pd.DataFrame(rng.uniform(lower, upper, size=(samples, len(axes))), columns=bundle.features)
+        exact_shap = np.concatenate([bundle.shap_values(sample[start:start + chunk_size])
+                                     for start in range(0, samples, chunk_size)])
+        shap_error = np.abs(grid.lookup(sample.to_numpy()) - exact_shap)
+        grid.error = {
+            'samples': samples,
+            'shapMaxAbs': float(shap_error.max()),
+            'shapMeanAbs': float(shap_error.mean()),
+            'shapP99Abs': float(np.percentile(shap_error, 99)),
+        }
+        return grid
+
+    @classmethod
+    def build_in_subprocess(cls, bundle: ModelBundle, points: int = 21, nice: int = 10) -> 'ShapGrid':
+        """
+        Builds a grid with the `shap-grid` command in a separate, lower priority Python process,
+        so the calling process keeps serving requests at full speed while it runs.
+        """
+        with tempfile.TemporaryDirectory(prefix='shap-grid-') as tmp_dir:
+            source = os.path.join(tmp_dir, 'bundle.joblib')
+            output = os.path.join(tmp_dir, 'grid.npz')
+            joblib.dump({'path': bundle.path, 'manifest': bundle.manifest, 'model': bundle.model,
+                         'scaler': bundle.scaler, 'background': bundle.background}, source)
+            subprocess.run([sys.executable, os.path.abspath(__file__), 'shap-grid', source,
+                            '--points', str(points), '--output', output, '--nice', str(nice)], check=True)
+            return cls.load(output)
+
+    def contains(self, scaled: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of rows inside the grid.
+        """
+        return np.all((scaled >= self.lower) & (scaled <= self.upper), axis=1)
+
+    def lookup(self, scaled: np.ndarray) -> np.ndarray:
+        """
+        Interpolated SHAP values (rows x features) for rows inside the grid.
+        """
+        position = (np.asarray(scaled, dtype=np.float64) - self.lower) / self.step
+        cell = np.clip(np.floor(position).astype(np.int64), 0, self.points - 2)
+        fraction = np.clip(position - cell, 0.0, 1.0)
+
+        base = np.ravel_multi_index(cell.T, (self.points,) * cell.shape[1])
+        # (rows, corners) weights: product over axes of fraction or 1 - fraction
+        weights = np.prod(np.where(self._corners[None, :, :], fraction[:, None, :], 1.0 - fraction[:, None, :]), axis=2)
+        corner_values = self._flat[base[:, None] + self._corner_offsets[None, :]]
+        return np.einsum('rc,rcv->rv', weights, corner_values)
+
+    def save(self, path: str):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp_path, lower=self.lower, upper=self.upper, values=self.values, error=json.dumps(self.error))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ShapGrid':
+        data = np.load(path, allow_pickle=False)
+        return cls(data['lower'], data['upper'], data['values'], json.loads(str(data['error'])))
+
+
+def save_bundle(model, scaler, metrics: Dict[str, Any], params: Dict[str, Any], embedding_model: str,
+                background: Optional[np.ndarray] = None, features: List[str] = FEATURES,
+                bundles_dir: str = BUNDLES_DIR, extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Writes a versioned bundle and returns its path. The bundle is written to a temporary
+    directory first and renamed into place, so a bundle directory is always complete.
+    """
+    created = datetime.now(timezone.utc)
+    version = f"{created:%Y%m%d-%H%M%S}-{type(model).__name__}"
+    path = os.path.join(bundles_dir, version)
+    os.makedirs(bundles_dir, exist_ok=True)
+
+    tmp_path = tempfile.mkdtemp(prefix=f".{version}-", dir=bundles_dir)
+    joblib.dump(model, os.path.join(tmp_path, 'model.joblib'))
+    joblib.dump(scaler, os.path.join(tmp_path, 'scaler.joblib'))
+    if background is not None:
+        np.save(os.path.join(tmp_path, 'background.npy'), background)
+
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as file:
+        json.dump({
+            'version': version,
+            'created': created.isoformat(),
+            'modelType': type(model).__name__,
+            'features': list(features),
+            'embeddingModel': embedding_model,
+            'metrics': metrics,
+            'params': params,
+            **(extra or {}),
+        }, file, indent=4, default=str)
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_bundle(path: str) -> ModelBundle:
+    """
+    Loads a bundle directory.
+    """
+    with open(os.path.join(path, 'manifest.json'), 'r') as file:
+        manifest = json.load(file)
+
+    background_path = os.path.join(path, 'background.npy')
+    background = np.load(background_path) if os.path.exists(background_path) else None
+
+    return ModelBundle(
+        path,
+        manifest,
+        joblib.load(os.path.join(path, 'model.joblib')),
+        joblib.load(os.path.join(path, 'scaler.joblib')),
+        background,
+    )
+
+
+def current_bundle_path(bundles_dir: str = BUNDLES_DIR, pointer: str = CURRENT_POINTER) -> Optional[str]:
+    """
+    Returns the path of the bundle named in a pointer file (CURRENT by default), if any.
+    """
+    try:
+        with open(os.path.join(bundles_dir, pointer), 'r') as file:
+            name = file.read().strip()
+    except OSError:
+        return None
+    return os.path.join(bundles_dir, name) if name else None
+
+
+def promote_bundle(path: Optional[str], bundles_dir: str = BUNDLES_DIR, pointer: str = CURRENT_POINTER):
+    """
+    Points a pointer file (CURRENT by default) at a bundle by atomically rewriting it.
+    A path of None clears the pointer.
+    """
+    pointer_path = os.path.join(bundles_dir, pointer)
+    tmp_pointer = f"{pointer_path}.{os.getpid()}.tmp"
+    with open(tmp_pointer, 'w') as file:
+        file.write(os.path.basename(os.path.normpath(path)) if path else '')
+    os.replace(tmp_pointer, pointer_path)
+
+
+class ModelRegistry:
+    """
+    Serves the live bundle and an optional shadow bundle.
+
+    - A daemon thread polls the CURRENT and SHADOW pointers. A changed bundle is loaded
+      and warmed (explainer built) in that thread, then swapped in with a single
+      reference assignment, so requests never wait on a load and each request sees
+      one consistent bundle.
+    - Shadow scoring runs on a single background worker. Requests only enqueue their
+      features; when the queue is full, shadow samples are dropped rather than delayed.
+      Disagreements with the live model are appended to a JSONL log.
+    """
+
+    def __init__(self, bundles_dir: str = BUNDLES_DIR, live_path: Optional[str] = None,
+                 fallback: Optional[Callable[[], ModelBundle]] = None, embedding_model: Optional[str] = None,
+                 poll_interval: float = 5.0, shadow_log: Optional[str] = None,
+                 shadow_threshold: float = 0.2, max_shadow_queue: int = 1000, shap_grid_points: int = 0):
+        """
+        @param live_path: pin the live bundle to this path instead of following CURRENT
+        @param fallback: builds the live bundle when no bundle is configured
+        @param shadow_threshold: probability difference that counts as a disagreement
+        @param shap_grid_points: grid nodes per feature for live tree bundles (0 disables the SHAP grid)
+        """
+        self.bundles_dir = bundles_dir
+        self.live_path = live_path
+        self.fallback = fallback
+        self.embedding_model = embedding_model
+        self.poll_interval = poll_interval
+        self.shadow_log = shadow_log
+        self.shadow_threshold = shadow_threshold
+        self.max_shadow_queue = max_shadow_queue
+        if shap_grid_points < 0 or shap_grid_points == 1:
+            raise ValueError(f"shap_grid_points must be 0 (disabled) or at least 2, got {shap_grid_points}")
+        self.shap_grid_points = shap_grid_points
+
+        self._live: Optional[ModelBundle] = None
+        self._shadow: Optional[ModelBundle] = None
+        self._targets: Dict[str, Optional[str]] = {}  # pointer -> bundle path last seen
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+        self._shadow_pending = 0
+        self._shadow_stats = self._empty_shadow_stats()
+
+    @property
+    def live(self) -> ModelBundle:
+        """
+        The live bundle. The first access loads it and starts the pointer watcher.
+        """
+        if self._live is None:
+            with self._lock:
+                if self._live is None:
+                    path = self.live_path or current_bundle_path(self.bundles_dir)
+                    self._targets[CURRENT_POINTER] = path
+                    self._live = self._load(path) if path else self._warm(self.fallback())
+                    self._check_embedding_model(self._live)
+                    self._start_watcher()
+        return self._live
+
+    @property
+    def shadow_bundle(self) -> Optional[ModelBundle]:
+        return self._shadow
+
+    def _load(self, path: str) -> ModelBundle:
+        return self._warm(load_bundle(path))
+
+    def _warm(self, bundle: ModelBundle) -> ModelBundle:
+        bundle.explainer  # Built here, not on the first request that uses the bundle
+        return bundle
+
+    def _shap_grid_cache_path(self, bundle: ModelBundle) -> str:
+        """
+        Where a bundle's SHAP grid is cached: inside a bundle directory, or next to a single-file
+        (legacy) model, keyed by the model file's path and mtime and the scaler's state.
+        """
+        name = f"shap_values_grid_{self.shap_grid_points}.npz"
+        if os.path.isdir(bundle.path):
+            return os.path.join(bundle.path, name)
+        key = hashlib.sha256(f"{os.path.abspath(bundle.path)}\n{os.path.getmtime(bundle.path)}".encode('utf-8')
+                             + pickle.dumps(bundle.scaler)).hexdigest()[:16]
+        return os.path.join(os.path.dirname(bundle.path), f".{os.path.basename(bundle.path)}.{key}.{name}")
+
+    def _attach_shap_grid(self, bundle: ModelBundle):
+        """
+        Loads the cached SHAP grid of a live bundle, or builds it in a child process (see
+        ShapGrid.build_in_subprocess) and caches it. Runs on its own thread (see _start_shap_grid)
+        after the bundle is live; until the grid is attached, or if building it fails, the bundle
+        explains rows exactly.
+        """
+        if not self.shap_grid_points or bundle.shap_grid is not None:
+            return
+        if not isinstance(bundle.explainer, shap.TreeExplainer):
+            print(f"SHAP grid skipped for {bundle.version}: only tree models are supported")
+            return
+
+        started = time.perf_counter()
+        try:
+            cache_path = self._shap_grid_cache_path(bundle)
+            if os.path.exists(cache_path):
+                bundle.shap_grid = ShapGrid.load(cache_path)
+                return
+            grid = ShapGrid.build_in_subprocess(bundle, self.shap_grid_points)
+        except Exception as e:
+            print(f"Failed to build the SHAP grid for {bundle.version}: {e}")
+            return
+        print(f"SHAP grid for {bundle.version}: {grid.values[..., 0].size} nodes in "
+              f"{time.perf_counter() - started:.1f}s, error vs exact: {json.dumps(grid.error)}")
+        try:
+            grid.save(cache_path)
+        except OSError as e:
+            print(f"Could not cache the SHAP grid: {e}")
+        bundle.shap_grid = grid
+
+    def _start_shap_grid(self, bundle: ModelBundle):
+        """
+        Attaches the SHAP grid in the background, so pointer changes are still picked up while it builds.
+        """
+        if self.shap_grid_points:
+            threading.Thread(target=self._attach_shap_grid, args=(bundle,), name='shap-grid', daemon=True).start()
+
+    def _check_embedding_model(self, bundle: ModelBundle):
+        trained_with = bundle.manifest.get('embeddingModel')
+        if self.embedding_model and trained_with != self.embedding_model:
+            print(f"Warning: model bundle {bundle.version} was trained with embeddings from "
+                  f"{trained_with}, but the backend uses {self.embedding_model}")
+
+    def _start_watcher(self):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        self._start_shap_grid(self._live)
+        while True:
+            self.refresh()
+            time.sleep(self.poll_interval)
+
+    def refresh(self):
+        """
+        Reloads the live and shadow bundles if their pointers changed. A bundle that fails
+        to load is reported once and the previous bundle keeps serving.
+        """
+        if not self.live_path:
+            path = current_bundle_path(self.bundles_dir)
+            if path and path != self._targets.get(CURRENT_POINTER):
+                self._targets[CURRENT_POINTER] = path
+                try:
+                    bundle = self._load(path)
+                except Exception as e:
+                    print(f"Failed to load model bundle {path}, keeping {self.live.version}: {e}")
+                else:
+                    self._check_embedding_model(bundle)
+                    previous, self._live = self._live, bundle
+                    print(f"Live model swapped: {previous.version if previous else None} -> {bundle.version}")
+                    self._start_shap_grid(bundle)
+
+        path = current_bundle_path(self.bundles_dir, SHADOW_POINTER)
+        if path != self._targets.get(SHADOW_POINTER):
+            self._targets[SHADOW_POINTER] = path
+            try:
+                bundle = self._load(path) if path else None
+            except Exception as e:
+                print(f"Failed to load shadow bundle {path}: {e}")
+                bundle = None
+            if bundle is not None:
+                self._check_embedding_model(bundle)
+            self._shadow = bundle
+            self._shadow_stats = self._empty_shadow_stats()
+            print(f"Shadow model: {bundle.version if bundle else None}")
+
+    def _empty_shadow_stats(self) -> Dict[str, Any]:
+        return {'scored': 0, 'disagreements': 0, 'dropped': 0, 'absDeltaSum': 0.0}
+
+    def shadow(self, features: Dict[str, float], prediction: int, probability: float, live_version: str):
+        """
+        Queues a request's features for shadow scoring against the live result. Never blocks.
+        @param live_version: version of the bundle that produced the live result (the live
+                             bundle may have been swapped since)
+        """
+        shadow = self._shadow
+        if shadow is None:
+            return
+        with self._lock:
+            if self._shadow_pending >= self.max_shadow_queue:
+                self._shadow_stats['dropped'] += 1
+                return
+            self._shadow_pending += 1
+        self._shadow_executor.submit(self._score_shadow, shadow, live_version, dict(features), prediction, probability)
+
+    def _score_shadow(self, shadow: ModelBundle, live_version: str, features: Dict[str, float],
+                      prediction: int, probability: float):
+        try:
+            predictions, probabilities = shadow.score([features])
+            shadow_prediction, shadow_probability = int(predictions[0]), float(probabilities[0])
+            delta = shadow_probability - probability
+
+            stats = self._shadow_stats
+            stats['scored'] += 1
+            stats['absDeltaSum'] += abs(delta)
+            if shadow_prediction == prediction and abs(delta) < self.shadow_threshold:
+                return
+
+            stats['disagreements'] += 1
+            if self.shadow_log:
+                os.makedirs(os.path.dirname(self.shadow_log) or '.', exist_ok=True)
+                with open(self.shadow_log, 'a', encoding='utf-8') as file:
+                    file.write(json.dumps({
+                        'time': datetime.now(timezone.utc).isoformat(),
+                        'liveVersion': live_version,
+                        'shadowVersion': shadow.version,
+                        'features': features,
+                        'livePrediction': prediction,
+                        'liveProbability': probability,
+                        'shadowPrediction': shadow_prediction,
+                        'shadowProbability': shadow_probability,
+                        'probabilityDelta': delta,
+                    }) + '\n')
+        except Exception as e:
+            print(f"Shadow scoring failed: {e}")
+        finally:
+            with self._lock:
+                self._shadow_pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Live/shadow versions and shadow agreement counters (reset when the shadow bundle changes).
+        """
+        stats = dict(self._shadow_stats)
+        abs_delta_sum = stats.pop('absDeltaSum')
+        return {
+            'liveVersion': self._live.version if self._live else None,
+            'shadowVersion': self._shadow.version if self._shadow else None,
+            'shapGrid': self._live.shap_grid.error if self._live and self._live.shap_grid else None,
+            'shadow': {
+                **stats,
+                'pending': self._shadow_pending,
+                'meanAbsProbabilityDelta': abs_delta_sum / stats['scored'] if stats['scored'] else None,
+            },
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage model bundles')
+    parser.add_argument('--bundles-dir', default=BUNDLES_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='List bundles and their metrics')
+    promote = subparsers.add_parser('promote', help='Make a bundle the live one')
+    promote.add_argument('path')
+    shadow = subparsers.add_parser('shadow', help='Score a candidate bundle alongside the live one')
+    shadow.add_argument('path', nargs='?')
+    shadow.add_argument('--clear', action='store_true', help='Stop shadow scoring')
+    grid = subparsers.add_parser('shap-grid', help='Precompute the SHAP lookup grid of a tree bundle')
+    grid.add_argument('path', help='Bundle directory, or a joblib file written by ShapGrid.build_in_subprocess')
+    grid.add_argument('--points', type=int, default=21, help='Grid nodes per feature')
+    grid.add_argument('--output', help='Defaults to <bundle>/shap_values_grid_<points>.npz')
+    grid.add_argument('--nice', type=int, default=0, help='Lower this process\'s CPU priority by this much')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        live = current_bundle_path(args.bundles_dir)
+        candidate = current_bundle_path(args.bundles_dir, SHADOW_POINTER)
+        for name in sorted(os.listdir(args.bundles_dir)) if os.path.isdir(args.bundles_dir) else []:
+            path = os.path.join(args.bundles_dir, name)
+            if name.startswith('.') or not os.path.isfile(os.path.join(path, 'manifest.json')):
+                continue
+            with open(os.path.join(path, 'manifest.json'), 'r') as file:
+                manifest = json.load(file)
+            marker = 'live' if path == live else 'shadow' if path == candidate else ''
+            print(f"{name:<40} {marker:<7} {json.dumps(manifest.get('metrics', {}))}")
+    elif args.command == 'promote':
+        load_bundle(args.path)  # Refuse to point at a bundle that does not load
+        promote_bundle(args.path, args.bundles_dir)
+        print(f"Live bundle: {args.path}")
+    elif args.command == 'shadow':
+        if args.clear or not args.path:
+            promote_bundle(None, args.bundles_dir, SHADOW_POINTER)
+            print("Shadow scoring stopped")
+        else:
+            load_bundle(args.path)
+            promote_bundle(args.path, args.bundles_dir, SHADOW_POINTER)
+            print(f"Shadow bundle: {args.path}")
+    elif args.command == 'shap-grid':
+        if args.nice:
+            os.nice(args.nice)
+        if os.path.isdir(args.path):
+            bundle = load_bundle(args.path)
+        else:
+            parts = joblib.load(args.path)
+            bundle = ModelBundle(parts['path'], parts['manifest'], parts['model'], parts['scaler'], parts['background'])
+        if not args.output and not os.path.isdir(args.path):
+            parser.error('--output is required unless path is a bundle directory')
+        output = args.output or os.path.join(args.path, f"shap_values_grid_{args.points}.npz")
+        ShapGrid.build(bundle, args.points).save(output)
+        print(f"SHAP grid for {bundle.version} written to {output}")
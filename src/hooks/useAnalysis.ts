@@ -39,6 +39,68 @@ const initialState: AnalysisState = {
  */
 const BACKEND_URL = 'https://scalpless-mireille-unneighborly.ngrok-free.dev';
 
+/**
+ * Last response body and ETag of recent identical requests, so a repeated request
+ * is revalidated (304, no body over the tunnel) instead of downloaded again.
+ * The backend only sends ETags for deterministic POSTs (/api/predict).
+ */
+const MAX_CACHED_RESPONSES = 20;
+const etagCache = new Map<string, { etag: string; body: string }>();
+
+/**
+ * Tracker application of each analysed resume/job pair, so re-running the prediction
+ * re-scores the same application instead of tracking a new one.
+ */
+const trackedApplications = new Map<string, string>();
+
+/**
+ * POSTs JSON that references server-side artifacts (resumeId/jobId) instead of full texts.
+ * Falls back to the full texts when an id is missing, and retries once with them
+ * if the backend no longer has the artifacts (404 after expiry/restart).
+ * The endpoint may include ?fields=... to receive only the fields that are used.
+ */
+async function postWithArtifacts(
+  endpoint: string,
+  ids: Record<string, string | undefined>,
+  texts: object,
+  shared: object,
+): Promise<Response> {
+  const post = async (payload: object) => {
+    const body = JSON.stringify({ ...payload, ...shared });
+    const key = `${endpoint}\n${body}`;
+    const cached = etagCache.get(key);
+
+    const response = await fetch(`${BACKEND_URL}${endpoint}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(cached ? { 'If-None-Match': cached.etag } : {}),
+      },
+      body,
+    });
+
+    if (response.status === 304 && cached) {
+      return new Response(cached.body, { status: 200, headers: { 'Content-Type': 'application/json' } });
+    }
+
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+      etagCache.delete(key);
+      etagCache.set(key, { etag, body: await response.clone().text() });
+      if (etagCache.size > MAX_CACHED_RESPONSES) {
+        etagCache.delete(etagCache.keys().next().value as string);
+      }
+    }
+    return response;
+  };
+
+  if (Object.values(ids).some(id => !id)) {
+    return post(texts);
+  }
+  const response = await post(ids);
+  return response.status === 404 ? post(texts) : response;
+}
+
 export function useAnalysis() {
   const [state, setState] = useState<AnalysisState>(initialState);
 
@@ -80,7 +142,8 @@ export function useAnalysis() {
       const formData = new FormData();
       formData.append('file', file);
 
-      const response = await fetch(`${BACKEND_URL}/api/parse-resume`, {
+      // rawText is not used once the cleaned text exists, so it is not downloaded
+      const response = await fetch(`${BACKEND_URL}/api/parse-resume?fields=resumeId,cleanedText`, {
         method: 'POST',
         body: formData,
       });
@@ -92,9 +155,10 @@ export function useAnalysis() {
       const data = await response.json();
       
       const resumeData: ResumeData = {
-        rawText: data.rawText,
+        rawText: data.rawText ?? data.cleanedText,
         fileName: file.name,
         cleanedText: data.cleanedText,
+        resumeId: data.resumeId,
       };
 
       setState(prev => ({
@@ -139,7 +203,8 @@ export function useAnalysis() {
     setError('jobPosting', null);
 
     try {
-      const response = await fetch(`${BACKEND_URL}/api/scrape-job`, {
+      // Only the augmented description is shown and matched against, so the original is not downloaded
+      const response = await fetch(`${BACKEND_URL}/api/scrape-job?fields=jobId,role,company,augmentedDescription`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ url }),
@@ -153,10 +218,11 @@ export function useAnalysis() {
       
       const jobData: JobPostingData = {
         role: data.role,
-        description: data.description,
+        description: data.description ?? data.augmentedDescription,
         augmentedDescription: data.augmentedDescription,
         sourceUrl: url,
         company: data.company,
+        jobId: data.jobId,
       };
 
       setState(prev => ({
@@ -203,15 +269,23 @@ export function useAnalysis() {
     setLoading('prediction', true);
     setError('prediction', null);
 
+    const pairKey = state.resume.resumeId && state.jobPosting.jobId
+      ? `${state.resume.resumeId}|${state.jobPosting.jobId}`
+      : undefined;
+
     try {
-      const response = await fetch(`${BACKEND_URL}/api/predict`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          resumeText: state.resume.cleanedText || state.resume.rawText,
-          jobDescription: state.jobPosting.augmentedDescription || state.jobPosting.description,
-          role: state.jobPosting.role,
-        }),
+      // The backend records the scores in the tracker and returns the application's id
+      const response = await postWithArtifacts('/api/predict', {
+        resumeId: state.resume.resumeId,
+        jobId: state.jobPosting.jobId,
+      }, {
+        resumeText: state.resume.cleanedText || state.resume.rawText,
+        jobDescription: state.jobPosting.augmentedDescription || state.jobPosting.description,
+      }, {
+        role: state.jobPosting.role,
+        company: state.jobPosting.company,
+        jobUrl: state.jobPosting.sourceUrl,
+        applicationId: pairKey ? trackedApplications.get(pairKey) : undefined,
       });
 
       if (!response.ok) {
@@ -219,6 +293,9 @@ export function useAnalysis() {
       }
 
       const data: PredictionResult = await response.json();
+      if (pairKey && data.applicationId) {
+        trackedApplications.set(pairKey, data.applicationId);
+      }
 
       setState(prev => ({
         ...prev,
@@ -291,15 +368,17 @@ export function useAnalysis() {
     setError('tailoring', null);
 
     try {
-      const response = await fetch(`${BACKEND_URL}/api/tailor-resume`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          resumeText: state.resume.cleanedText || state.resume.rawText,
-          jobDescription: state.jobPosting?.augmentedDescription || state.jobPosting?.description,
-          feedback: state.prediction.feedback,
-          shapValues: state.prediction.shapValues,
-        }),
+      const response = await postWithArtifacts('/api/tailor-resume?fields=content,improvements', {
+        resumeId: state.resume.resumeId,
+        jobId: state.jobPosting?.jobId,
+      }, {
+        resumeText: state.resume.cleanedText || state.resume.rawText,
+        jobDescription: state.jobPosting?.augmentedDescription || state.jobPosting?.description,
+      }, {
+        feedback: state.prediction.feedback,
+        shapValues: state.prediction.shapValues,
+        // Saves the tailored resume to the tracked application
+        applicationId: state.prediction.applicationId,
       });
 
       if (!response.ok) {
@@ -351,15 +430,19 @@ export function useAnalysis() {
     setError('coverLetter', null);
 
     try {
-      const response = await fetch(`${BACKEND_URL}/api/generate-cover-letter`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          resumeText: state.tailoredResume.content,
-          jobDescription: state.jobPosting.augmentedDescription || state.jobPosting.description,
-          role: state.jobPosting.role,
-          company: state.jobPosting.company,
-        }),
+      // The tailored resume only exists client-side, so it is always sent in full
+      const response = await postWithArtifacts('/api/generate-cover-letter?fields=content,keyPointsAddressed', {
+        jobId: state.jobPosting.jobId,
+      }, {
+        jobDescription: state.jobPosting.augmentedDescription || state.jobPosting.description,
+      }, {
+        resumeText: state.tailoredResume.content,
+        // Identifies the application, so the backend reuses the tailor call's cached JD prefix
+        // and saves the cover letter to the tracked application
+        resumeId: state.resume?.resumeId,
+        applicationId: state.prediction?.applicationId,
+        role: state.jobPosting.role,
+        company: state.jobPosting.company,
       });
 
       if (!response.ok) {
@@ -396,7 +479,7 @@ export function useAnalysis() {
     } finally {
       setLoading('coverLetter', false);
     }
-  }, [state.tailoredResume, state.jobPosting, setLoading, setError]);
+  }, [state.tailoredResume, state.jobPosting, state.prediction, setLoading, setError]);
 
   /**
    * Resets the entire analysis state
@@ -9,6 +9,8 @@ export interface ResumeData {
   fileName: string;
   /** Cleaned/processed text ready for embedding */
   cleanedText?: string;
+  /** Server-side artifact id, sent instead of the full text on later calls */
+  resumeId?: string;
 }
 
 /**
@@ -26,6 +28,8 @@ export interface JobPostingData {
   sourceUrl: string;
   /** Company name if available */
   company?: string;
+  /** Server-side artifact id, sent instead of the full description on later calls */
+  jobId?: string;
 }
 
 /**
@@ -84,6 +88,8 @@ export interface PredictionResult {
   shapValues: ShapValues;
   /** Human-readable feedback for each feature */
   feedback: FeatureFeedback[];
+  /** Tracker application the prediction was recorded on (tailored resume and cover letter are saved to it) */
+  applicationId?: string;
 }
 
 /**
@@ -0,0 +1,391 @@
+import os
+import json
+import time
+import uuid
+import queue
+import base64
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+STATUSES = ('pending', 'applied', 'interview', 'offer', 'rejected')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    job_url TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'pending',
+    applied_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    prediction INTEGER,
+    select_probability REAL,
+    feature_scores TEXT,
+    shap_values TEXT,
+    resume_id TEXT,
+    job_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS application_artifacts (
+    id INTEGER PRIMARY KEY,
+    application_id TEXT NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+-- List queries are always per user, newest first, optionally filtered by status/date
+CREATE INDEX IF NOT EXISTS idx_applications_user_date ON applications (user_id, applied_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_applications_user_status_date ON applications (user_id, status, applied_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_artifacts_application ON application_artifacts (application_id, created_at);
+"""
+
+# Columns returned by list queries (SHAP values, features and artifacts are only in get_application)
+LIST_COLUMNS = ('id', 'role', 'company', 'job_url', 'status', 'applied_at', 'updated_at', 'prediction', 'select_probability')
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Opens a connection to the tracker database in WAL mode, so reads never
+    block on the background writer.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, only the last commits may be lost on power failure
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-32000')  # ~32MB page cache
+    return conn
+
+
+def encode_cursor(applied_at: str, application_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{applied_at}|{application_id}".encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        applied_at, application_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    return applied_at, application_id
+
+
+class ApplicationTracker:
+    """
+    SQLite-backed application tracker.
+
+    Writes are queued and applied by a background thread in batched transactions,
+    so request handlers never wait on disk. Ids are generated up front, which lets
+    callers reference an application before its row is committed; reads see a write
+    once its batch is committed (within `flush_interval` seconds).
+    """
+
+    def __init__(self, path: str, batch_size: int = 2000, flush_interval: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._queue: "queue.Queue[Optional[Tuple[str, tuple]]]" = queue.Queue()
+
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name='tracker-writer', daemon=True)
+        self._writer.start()
+
+    # Writes are queued for the background writer
+
+    def add_application(self, user_id: str, role: str = '', company: str = '', job_url: str = '',
+                        status: str = 'pending', applied_at: Optional[str] = None,
+                        prediction: Optional[int] = None, select_probability: Optional[float] = None,
+                        feature_scores: Optional[Dict[str, float]] = None, shap_values: Optional[Dict[str, float]] = None,
+                        resume_id: Optional[str] = None, job_id: Optional[str] = None) -> str:
+        """
+        Queues a new application and returns its id.
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Invalid status '{status}', expected one of: {', '.join(STATUSES)}")
+
+        # Time-ordered ids keep primary-key inserts append-only in the B-tree
+        application_id = f"{time.time_ns():016x}{uuid.uuid4().hex[:16]}"
+        now = utc_now()
+        self._queue.put(('add_application', (
+            application_id, user_id, role or '', company or '', job_url or '', status, applied_at or now, now,
+            prediction, select_probability,
+            json.dumps(feature_scores) if feature_scores is not None else None,
+            json.dumps(shap_values) if shap_values is not None else None,
+            resume_id, job_id,
+        )))
+        return application_id
+
+    def update_status(self, application_id: str, status: str):
+        """
+        Queues a status change for an application.
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Invalid status '{status}', expected one of: {', '.join(STATUSES)}")
+        self._queue.put(('update_status', (status, utc_now(), application_id)))
+
+    def update_scores(self, application_id: str, prediction: Optional[int], select_probability: Optional[float],
+                      feature_scores: Optional[Dict[str, float]], shap_values: Optional[Dict[str, float]]):
+        """
+        Queues new model scores for an application (e.g. after re-running the prediction).
+        """
+        self._queue.put(('update_scores', (
+            prediction, select_probability,
+            json.dumps(feature_scores) if feature_scores is not None else None,
+            json.dumps(shap_values) if shap_values is not None else None,
+            utc_now(), application_id,
+        )))
+
+    def add_artifact(self, application_id: str, kind: str, content: str):
+        """
+        Queues a generated artifact (tailored resume, cover letter, ...) for an application.
+        """
+        self._queue.put(('add_artifact', (application_id, kind, content, utc_now())))
+
+    def flush(self):
+        """
+        Blocks until every queued write has been committed.
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Commits every queued write and stops the writer thread. Safe to call more than once.
+        """
+        if not self._writer.is_alive():
+            return
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    _STATEMENTS = {
+        'add_application': """
+            INSERT INTO applications (id, user_id, role, company, job_url, status, applied_at, updated_at,
+                                      prediction, select_probability, feature_scores, shap_values, resume_id, job_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        'update_status': "UPDATE applications SET status = ?, updated_at = ? WHERE id = ?",
+        'update_scores': """
+            UPDATE applications SET prediction = ?, select_probability = ?, feature_scores = ?, shap_values = ?, updated_at = ?
+            WHERE id = ?
+        """,
+        # Artifacts for applications that do not exist (e.g. a stale applicationId) are dropped
+        'add_artifact': """
+            INSERT INTO application_artifacts (application_id, kind, content, created_at)
+            SELECT ?1, ?2, ?3, ?4 WHERE EXISTS (SELECT 1 FROM applications WHERE id = ?1)
+        """,
+    }
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+
+            # Collect a batch: everything queued within flush_interval, up to batch_size
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # Stop after this batch
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+
+            self._write_batch(conn, batch)
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, tuple]]):
+        # Consecutive operations of the same kind go through one executemany, in queue order
+        groups: List[Tuple[str, List[tuple]]] = []
+        for op, params in batch:
+            if groups and groups[-1][0] == op:
+                groups[-1][1].append(params)
+            else:
+                groups.append((op, [params]))
+
+        try:
+            with conn:
+                for op, rows in groups:
+                    conn.executemany(self._STATEMENTS[op], rows)
+        except sqlite3.Error:
+            # Retry one by one so a single bad row does not drop the whole batch
+            for op, rows in groups:
+                for params in rows:
+                    try:
+                        with conn:
+                            conn.execute(self._STATEMENTS[op], params)
+                    except sqlite3.Error as e:
+                        print(f"Tracker: dropped {op} write: {e}")
+
+    # Reads use one connection per thread
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def list_applications(self, user_id: str, status: Optional[str] = None,
+                          date_from: Optional[str] = None, date_to: Optional[str] = None,
+                          limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Lists a user's applications, newest first.
+
+        Uses keyset pagination: pass the returned `nextCursor` to get the next page,
+        which stays fast no matter how deep the page is.
+        """
+        limit = max(1, min(int(limit), 200))
+        clauses = ['user_id = ?']
+        params: List[Any] = [user_id]
+
+        if status:
+            clauses.append('status = ?')
+            params.append(status)
+        if date_from:
+            clauses.append('applied_at >= ?')
+            params.append(date_from)
+        if date_to:
+            clauses.append('applied_at < ?')
+            params.append(date_to)
+        if cursor:
+            applied_at, application_id = decode_cursor(cursor)
+            clauses.append('(applied_at, id) < (?, ?)')
+            params.extend([applied_at, application_id])
+
+        rows = self._conn().execute(
+            f"SELECT {', '.join(LIST_COLUMNS)} FROM applications WHERE {' AND '.join(clauses)} "
+            f"ORDER BY applied_at DESC, id DESC LIMIT ?",
+            params + [limit + 1],
+        ).fetchall()
+
+        items = [_row_to_dict(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(items[-1]['appliedAt'], items[-1]['id']) if len(rows) > limit else None
+        return {'items': items, 'nextCursor': next_cursor}
+
+    def get_application(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns an application with its scores, SHAP values and generated artifacts.
+        """
+        conn = self._conn()
+        row = conn.execute('SELECT * FROM applications WHERE id = ?', (application_id,)).fetchone()
+        if row is None:
+            return None
+
+        application = _row_to_dict(row)
+        application['artifacts'] = [
+            {'kind': a['kind'], 'content': a['content'], 'createdAt': a['created_at']}
+            for a in conn.execute(
+                'SELECT kind, content, created_at FROM application_artifacts WHERE application_id = ? ORDER BY created_at',
+                (application_id,),
+            )
+        ]
+        return application
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    """
+    Converts a database row to the camelCase shape used by the API.
+    """
+    result = {}
+    for key in row.keys():
+        value = row[key]
+        if key in ('feature_scores', 'shap_values') and value is not None:
+            value = json.loads(value)
+        head, *rest = key.split('_')
+        result[head + ''.join(word.capitalize() for word in rest)] = value
+    return result
+
+
+# ====================
+# BENCHMARK
+# ====================
+
+def benchmark(path: str, rows: int, users: int):
+    """
+    Measures insert throughput through the batched writer and the latency
+    of the list queries on a database with `rows` applications.
+    """
+    import random
+
+    if os.path.exists(path):
+        raise SystemExit(f"{path} already exists, pass a new path for the benchmark database")
+
+    tracker = ApplicationTracker(path)
+    start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    shap_values = {'Resume_JD_Sim': 0.1, 'Role_Resume_Sim': -0.2, 'Word_Overlap': 0.3, 'Tech_Keyword_Overlap': -0.4}
+
+    started = time.perf_counter()
+    for i in range(rows):
+        applied_at = (start_date + timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        tracker.add_application(
+            f"user-{random.randrange(users)}", role='Data Scientist', company='Company', status=random.choice(STATUSES),
+            applied_at=applied_at, prediction=1, select_probability=random.random(), feature_scores=shap_values,
+            shap_values=shap_values,
+        )
+    tracker.flush()
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {rows:,} applications in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+    def timed(label: str, runs: int = 200, **kwargs):
+        latencies = []
+        for _ in range(runs):
+            t = time.perf_counter()
+            tracker.list_applications(f"user-{random.randrange(users)}", **kwargs)
+            latencies.append((time.perf_counter() - t) * 1000)
+        latencies.sort()
+        print(f"{label:<28} p50={latencies[len(latencies) // 2]:.2f}ms  p99={latencies[int(len(latencies) * 0.99)]:.2f}ms")
+
+    timed('list (first page)')
+    timed('list by status', status='interview')
+    timed('list by date range', date_from='2024-03-01', date_to='2024-04-01')
+
+    # Walk 20 pages deep to show keyset pagination does not slow down with depth
+    user = 'user-0'
+    page = tracker.list_applications(user)
+    t = time.perf_counter()
+    for _ in range(20):
+        if not page['nextCursor']:
+            break
+        page = tracker.list_applications(user, cursor=page['nextCursor'])
+    print(f"{'list page 21 (keyset)':<28} {(time.perf_counter() - t) * 1000 / 20:.2f}ms per page")
+
+    tracker.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Application tracker utilities')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench = subparsers.add_parser('benchmark', help='Benchmark insert and query throughput')
+    bench.add_argument('--db', default='data/tracker_benchmark.db', help='Path of a new database to create')
+    bench.add_argument('--rows', type=int, default=300_000)
+    bench.add_argument('--users', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        benchmark(args.db, args.rows, args.users)
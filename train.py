@@ -0,0 +1,172 @@
+"""
+Scripted version of training.ipynb: trains every model family on the same cached
+feature matrix and CV folds, and emits a versioned model bundle for backend.py.
+
+- The feature matrix is read from the final dataset pickle once and cached as .npz.
+- The train/test split and scaling are done once; all model families share the same
+  StratifiedKFold folds.
+- Hyperparameters are searched with successive halving (HalvingGridSearchCV): every
+  candidate starts on a small sample and only the best ones get more data. Folds run
+  in parallel worker processes (n_jobs).
+
+Usage:
+    python train.py --data data/final_resume_screening_dataset.pkl --promote
+    python train.py --data data/final_resume_screening_dataset.pkl --shadow
+"""
+import os
+import time
+import argparse
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.model_selection import HalvingGridSearchCV, StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.svm import SVC
+from sklearn.neural_network import MLPClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from model_bundle import BUNDLES_DIR, FEATURES, SHADOW_POINTER, promote_bundle, save_bundle
+
+EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+RANDOM_STATE = 42
+
+
+def load_feature_matrix(data_path: str, cache_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Loads the feature matrix and labels, from the .npz cache if it is newer than the pickle.
+    """
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(data_path):
+        cached = np.load(cache_path, allow_pickle=False)
+        if list(cached['features']) == FEATURES:
+            return cached['X'], cached['y']
+
+    data = pd.read_pickle(data_path)
+    X = data[FEATURES].to_numpy(dtype=np.float64)
+    y = data['Decision'].map({'select': 1, 'reject': 0}).to_numpy(dtype=np.int64)
+    np.savez(cache_path, X=X, y=y, features=np.array(FEATURES))
+    return X, y
+
+
+def candidates() -> Dict[str, Tuple[Any, Dict[str, List]]]:
+    """
+    Model families and their search grids (same grids as training.ipynb, plus SVM/MLP grids).
+    """
+    models = {
+        'RandomForest': (
+            RandomForestClassifier(random_state=RANDOM_STATE),
+            {'n_estimators': [100, 200, 300], 'max_depth': [5, 10, 15]},
+        ),
+        'SVM': (
+            SVC(kernel='rbf', probability=True, random_state=RANDOM_STATE),
+            {'C': [0.1, 1.0, 10.0], 'gamma': ['scale', 0.1]},
+        ),
+        'MLP': (
+            # early_stopping holds out 10% of each fit and stops once validation stops improving
+            MLPClassifier(max_iter=500, early_stopping=True, random_state=RANDOM_STATE),
+            {'hidden_layer_sizes': [(32,), (64, 32)], 'alpha': [1e-4, 1e-3]},
+        ),
+    }
+
+    try:
+        from xgboost import XGBClassifier
+        models['XGBoost'] = (
+            XGBClassifier(eval_metric='logloss', random_state=RANDOM_STATE, n_jobs=1),
+            {
+                'n_estimators': [100, 200],
+                'max_depth': [3, 5, 7],
+                'learning_rate': [0.01, 0.1],
+                'subsample': [0.8, 1.0],
+            },
+        )
+    except ImportError:
+        print("xgboost is not installed, skipping XGBoost")
+
+    return models
+
+
+def run(data_path: str, cache_path: str, families: List[str], n_jobs: int, promote: bool, bundles_dir: str,
+        shadow: bool = False):
+    X, y = load_feature_matrix(data_path, cache_path)
+
+    # Same split as training.ipynb
+    X_train, X_test, y_train, y_test = train_test_split(
+        pd.DataFrame(X, columns=FEATURES), y, test_size=0.2, random_state=RANDOM_STATE, stratify=y
+    )
+    # Fitted on a dataframe so the scaler checks feature names at inference time
+    scaler = StandardScaler()
+    X_train_scaled = pd.DataFrame(scaler.fit_transform(X_train), columns=FEATURES)
+    X_test_scaled = pd.DataFrame(scaler.transform(X_test), columns=FEATURES)
+
+    # Folds are computed once and shared by every model family
+    folds = list(StratifiedKFold(n_splits=5, shuffle=True, random_state=RANDOM_STATE).split(X_train_scaled, y_train))
+
+    results = []
+    for name, (estimator, grid) in candidates().items():
+        if families and name not in families:
+            continue
+
+        started = time.perf_counter()
+        search = HalvingGridSearchCV(
+            estimator,
+            grid,
+            cv=folds,
+            factor=3,
+            scoring='accuracy',
+            n_jobs=n_jobs,
+            random_state=RANDOM_STATE,
+        )
+        search.fit(X_train_scaled, y_train)
+        elapsed = time.perf_counter() - started
+
+        model = search.best_estimator_
+        probabilities = model.predict_proba(X_test_scaled)[:, 1]
+        metrics = {
+            'cvAccuracy': float(search.best_score_),
+            'testAccuracy': float(accuracy_score(y_test, model.predict(X_test_scaled))),
+            'testRocAuc': float(roc_auc_score(y_test, probabilities)),
+            'trainSeconds': round(elapsed, 2),
+        }
+        results.append((name, model, search.best_params_, metrics))
+        print(f"{name:<14} {elapsed:8.1f}s  cv={metrics['cvAccuracy']:.4f}  "
+              f"test={metrics['testAccuracy']:.4f}  auc={metrics['testRocAuc']:.4f}  {search.best_params_}")
+
+    if not results:
+        raise SystemExit("No model family was trained")
+
+    # Select on CV accuracy so the test set stays an unbiased estimate
+    name, model, params, metrics = max(results, key=lambda result: result[3]['cvAccuracy'])
+    background = X_train_scaled.sample(n=min(100, len(X_train_scaled)), random_state=RANDOM_STATE).to_numpy()
+    path = save_bundle(
+        model, scaler, metrics, params, EMBEDDING_MODEL,
+        background=background,
+        bundles_dir=bundles_dir,
+        extra={
+            'trainingData': os.path.basename(data_path),
+            'candidates': {result[0]: result[3] for result in results},
+        },
+    )
+    print(f"\nBest model: {name} -> {path}")
+
+    if promote:
+        promote_bundle(path, bundles_dir)
+        print("Promoted to the live bundle")
+    elif shadow:
+        promote_bundle(path, bundles_dir, SHADOW_POINTER)
+        print("Scoring as the shadow bundle")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train and select the match prediction model')
+    parser.add_argument('--data', default='data/final_resume_screening_dataset.pkl', help='Final feature dataset pickle')
+    parser.add_argument('--cache', default='data/final_resume_screening_features.npz', help='Feature matrix cache')
+    parser.add_argument('--models', nargs='*', default=[], help='Model families to train (default: all)')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Worker processes for the search')
+    parser.add_argument('--bundles-dir', default=BUNDLES_DIR)
+    parser.add_argument('--promote', action='store_true', help='Make the new bundle the live one')
+    parser.add_argument('--shadow', action='store_true', help='Score the new bundle alongside the live one')
+    args = parser.parse_args()
+
+    run(args.data, args.cache, args.models, args.n_jobs, args.promote, args.bundles_dir, args.shadow)